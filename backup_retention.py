@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Backup Retention
+Shared retention and garbage collection for the .backups directory written by every manager.
+
+Backups are grouped into series by name (e.g. metadata_backup_*.json, projects_*.html,
+gallery_backup_* snapshots, <post>_*.md) and pruned per series with a keep-last count,
+hourly/daily/weekly buckets and an optional cap on total size. Consecutive backups in a
+series with identical content are collapsed to the newest one first.
+
+Usage (from any manager):
+    python photo_manager.py prune [--dry-run] [--keep-last N] [--hourly N] [--daily N] [--weekly N] [--max-size 500MB]
+    python project_manager.py prune --dry-run
+    python scholar_manager.py prune --keep-last 3
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# <series>_<YYYYmmdd_HHMMSS>[_<n>][.ext], as produced by every create_backup()
+BACKUP_NAME_PATTERN = re.compile(r'^(?P<series>.+?)_(?P<timestamp>\d{8}_\d{6})(?:_\d+)?(?P<suffix>\.[^.]+)?$')
+
+DEFAULT_POLICY = {
+    "keep_last": 5,
+    "hourly": 24,
+    "daily": 7,
+    "weekly": 4,
+    "max_bytes": None,
+}
+
+SIZE_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+
+def parse_size(value: str) -> int:
+    """Parse sizes like '500MB' or '2GB' into bytes."""
+    match = re.match(r'^\s*(\d+(?:\.\d+)?)\s*([KMG]?B?)\s*$', value.upper())
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid size: {value}")
+    number, unit = match.groups()
+    if unit in ("K", "M", "G"):
+        unit += "B"
+    return int(float(number) * SIZE_UNITS[unit])
+
+
+def add_retention_arguments(parser: argparse.ArgumentParser):
+    """Add the prune command's policy flags to a manager's argument parser."""
+    parser.add_argument("--dry-run", action="store_true", help="Show what prune would delete without deleting")
+    parser.add_argument("--keep-last", type=int, help=f"Backups to keep per series (default: {DEFAULT_POLICY['keep_last']})")
+    parser.add_argument("--hourly", type=int, help=f"Hourly buckets to keep per series (default: {DEFAULT_POLICY['hourly']})")
+    parser.add_argument("--daily", type=int, help=f"Daily buckets to keep per series (default: {DEFAULT_POLICY['daily']})")
+    parser.add_argument("--weekly", type=int, help=f"Weekly buckets to keep per series (default: {DEFAULT_POLICY['weekly']})")
+    parser.add_argument("--max-size", type=parse_size, help="Cap on total backup size, e.g. 500MB")
+
+
+def retention_options(args: argparse.Namespace) -> Dict:
+    """Turn parsed prune flags into keyword arguments for BackupRetention."""
+    options = {"dry_run": args.dry_run}
+    for key in ("keep_last", "hourly", "daily", "weekly"):
+        if getattr(args, key) is not None:
+            options[key] = getattr(args, key)
+    if args.max_size is not None:
+        options["max_bytes"] = args.max_size
+    return options
+
+
+def parse_retention_options(argv: List[str]) -> Dict:
+    """Parse prune flags for managers that read sys.argv directly."""
+    parser = argparse.ArgumentParser(prog="prune", description="Prune old backups")
+    add_retention_arguments(parser)
+    return retention_options(parser.parse_args(argv))
+
+
+class BackupRetention:
+    """Applies a retention policy to a backups directory."""
+
+    def __init__(self, backup_dir: Path, keep_last: int = None, hourly: int = None, daily: int = None,
+                 weekly: int = None, max_bytes: Optional[int] = None):
+        self.backup_dir = Path(backup_dir)
+        self.keep_last = DEFAULT_POLICY["keep_last"] if keep_last is None else keep_last
+        self.hourly = DEFAULT_POLICY["hourly"] if hourly is None else hourly
+        self.daily = DEFAULT_POLICY["daily"] if daily is None else daily
+        self.weekly = DEFAULT_POLICY["weekly"] if weekly is None else weekly
+        self.max_bytes = max_bytes
+
+    def _entry_files(self, path: Path) -> Dict[Tuple[int, int], Tuple[int, int]]:
+        """Map each (device, inode) in a backup to its (size, link count)."""
+        paths = [path] if path.is_file() else [Path(root) / name for root, _, files in os.walk(path) for name in files]
+        inodes = {}
+        for file_path in paths:
+            stat = file_path.stat()
+            inodes[(stat.st_dev, stat.st_ino)] = (stat.st_size, stat.st_nlink)
+        return inodes
+
+    def _fingerprint(self, path: Path) -> str:
+        """Content fingerprint used to spot identical consecutive backups."""
+        digest = hashlib.blake2b(digest_size=16)
+        if path.is_file():
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+            return digest.hexdigest()
+
+        manifest_path = path / "manifest.json"
+        if manifest_path.exists():
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            digest.update(json.dumps(manifest.get("files", {}), sort_keys=True).encode('utf-8'))
+            # JSON files are rewritten in place, so hash their content rather than trusting mtimes
+            for relative in sorted(manifest.get("files", {})):
+                if relative.endswith('.json'):
+                    digest.update((path / relative).read_bytes())
+            return digest.hexdigest()
+
+        for root, _, files in sorted(os.walk(path)):
+            for name in sorted(files):
+                file_path = Path(root) / name
+                stat = file_path.stat()
+                digest.update(f"{file_path.relative_to(path).as_posix()}:{stat.st_size}:{stat.st_mtime_ns}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def scan(self) -> Dict[str, List[Dict]]:
+        """Group backups into series, newest first."""
+        series = {}
+        if not self.backup_dir.exists():
+            return series
+
+        for path in self.backup_dir.iterdir():
+            match = BACKUP_NAME_PATTERN.match(path.name)
+            if not match:
+                continue
+            try:
+                timestamp = datetime.strptime(match.group("timestamp"), "%Y%m%d_%H%M%S")
+            except ValueError:
+                continue
+            key = f"{match.group('series')}_*{match.group('suffix') or ''}"
+            series.setdefault(key, []).append({"path": path, "timestamp": timestamp})
+
+        for entries in series.values():
+            entries.sort(key=lambda entry: (entry["timestamp"], entry["path"].name), reverse=True)
+        return series
+
+    def _select(self, entries: List[Dict]) -> List[Dict]:
+        """Return the entries of one series (newest first) that the policy keeps."""
+        # Collapse runs of identical backups to the newest one
+        unique = []
+        previous = None
+        for entry in entries:
+            fingerprint = self._fingerprint(entry["path"])
+            if fingerprint != previous:
+                unique.append(entry)
+            else:
+                entry["duplicate"] = True
+            previous = fingerprint
+
+        keep = {id(entry) for entry in unique[:max(self.keep_last, 1)]}
+        for count, bucket in [
+            (self.hourly, lambda ts: ts.strftime("%Y-%m-%d %H")),
+            (self.daily, lambda ts: ts.strftime("%Y-%m-%d")),
+            (self.weekly, lambda ts: "%d-W%02d" % ts.isocalendar()[:2]),
+        ]:
+            seen = set()
+            for entry in unique:
+                if len(seen) >= count:
+                    break
+                key = bucket(entry["timestamp"])
+                if key not in seen:
+                    seen.add(key)
+                    keep.add(id(entry))
+
+        return [entry for entry in unique if id(entry) in keep]
+
+    @staticmethod
+    def _disk_usage(entries: Iterable[Dict], owned: Dict[Tuple[int, int], int]) -> int:
+        """Bytes the given backups occupy on disk, counting each backup-owned inode once."""
+        seen = set()
+        for entry in entries:
+            seen.update(key for key in entry["inodes"] if key in owned)
+        return sum(owned[key] for key in seen)
+
+    def prune(self, dry_run: bool = False) -> Dict:
+        """Delete backups outside the policy and return a summary.
+
+        Sizes are real disk use, like du: an inode hardlinked into several
+        snapshots is counted once, and files still hardlinked from outside
+        .backups (e.g. live gallery images) cost nothing until that link goes.
+        An entry's reported size is what deleting it alone would free.
+        """
+        series = self.scan()
+        delete = []
+        kept = []
+
+        for entries in series.values():
+            selected = self._select(entries)
+            selected_ids = {id(entry) for entry in selected}
+            for entry in entries:
+                entry["inodes"] = self._entry_files(entry["path"])
+                if id(entry) in selected_ids:
+                    entry["newest"] = entry is selected[0]
+                    kept.append(entry)
+                else:
+                    delete.append(entry)
+
+        # An inode belongs to the backups when every link to it lives in a backup
+        links = Counter(key for entries in series.values() for entry in entries for key in entry["inodes"])
+        owned = {}
+        for entries in series.values():
+            for entry in entries:
+                for key, (size, nlink) in entry["inodes"].items():
+                    if nlink <= links[key]:
+                        owned[key] = size
+        for entries in series.values():
+            for entry in entries:
+                entry["size"] = sum(owned[key] for key in entry["inodes"] if links[key] == 1 and key in owned)
+
+        # Enforce the size cap by dropping the oldest kept backups, never the newest of a series
+        if self.max_bytes is not None:
+            total = self._disk_usage(kept, owned)
+            for entry in sorted(kept, key=lambda e: e["timestamp"]):
+                if total <= self.max_bytes:
+                    break
+                if entry["newest"]:
+                    continue
+                kept.remove(entry)
+                entry["reason"] = "size cap"
+                delete.append(entry)
+                total = self._disk_usage(kept, owned)
+
+        kept_bytes = self._disk_usage(kept, owned)
+        freed = self._disk_usage(kept + delete, owned) - kept_bytes
+        for entry in sorted(delete, key=lambda e: e["timestamp"]):
+            reason = entry.get("reason") or ("duplicate" if entry.get("duplicate") else "expired")
+            print(f"  {'Would delete' if dry_run else '🗑️  Deleted'} {entry['path'].name} ({reason}, {entry['size'] / 1024:.0f}K)")
+            if not dry_run:
+                if entry["path"].is_dir():
+                    shutil.rmtree(entry["path"])
+                else:
+                    entry["path"].unlink()
+
+        summary = {
+            "series": len(series),
+            "kept": len(kept),
+            "deleted": len(delete),
+            "freed_bytes": freed,
+            "kept_bytes": kept_bytes,
+        }
+        verb = "Would free" if dry_run else "Freed"
+        print(f"✅ {summary['series']} series: kept {summary['kept']}, "
+              f"{'would delete' if dry_run else 'deleted'} {summary['deleted']}. "
+              f"{verb} {freed / 1024 / 1024:.1f} MB, {summary['kept_bytes'] / 1024 / 1024:.1f} MB retained")
+        return summary
+
+
+def prune_backups(backup_dir: Path, dry_run: bool = False, **policy) -> Dict:
+    """Apply the retention policy to a manager's backups folder."""
+    print(f"🧹 Pruning backups in {backup_dir}...")
+    return BackupRetention(backup_dir, **policy).prune(dry_run=dry_run)
@@ -10,6 +10,7 @@ Usage:
     python blog_manager.py remove       # Remove post
     python blog_manager.py preview      # Preview post
     python blog_manager.py validate     # Validate all posts for consistency
+    python blog_manager.py prune --dry-run  # Show which old backups would be deleted
 """
 
 import os
@@ -21,6 +22,7 @@ import subprocess
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
+from backup_retention import parse_retention_options, prune_backups
 
 try:
     from PIL import Image, ImageFilter, ImageEnhance
@@ -940,6 +942,8 @@ def main():
         blog_manager.preview_post()
     elif command == "validate":
         blog_manager.validate_all_posts()
+    elif command == "prune":
+        prune_backups(blog_manager.backup_dir, **parse_retention_options(sys.argv[2:]))
     else:
         print(f"Unknown command: {command}")
         print(__doc__)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Cache Policy
+Stale-while-revalidate freshness rules shared by the project, scholar and onesite caches.
+
+Cached entries are never dropped when a cache is loaded. Instead each entry is:
+    fresh    younger than the soft TTL (settings.cache_duration): served as is
+    stale    past the soft TTL but within the hard TTL (settings.cache_max_age):
+             served immediately, and revalidated by the next `refresh`/`update`
+    expired  past the hard TTL: refetched before use, but still served if the
+             refetch fails, so an offline or rate-limited run never loses data
+An entry can override either limit with its own "soft_ttl"/"hard_ttl" keys (seconds).
+
+Usage:
+    from cache_policy import CachePolicy, FRESH, STALE, EXPIRED
+    policy = CachePolicy.from_settings(config.get('settings', {}))
+    state = policy.state(cache.get(key))                     # uses entry['cached_at']
+    state = policy.state(cache, timestamp_key='last_updated')  # ISO timestamps work too
+"""
+
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+FRESH = "fresh"
+STALE = "stale"
+EXPIRED = "expired"
+
+DEFAULT_SOFT_TTL = 86400          # 24 hours
+DEFAULT_HARD_TTL = 30 * 86400     # 30 days
+
+
+class CachePolicy:
+    """Classifies cache entries as fresh, stale or expired."""
+
+    def __init__(self, soft_ttl: float = DEFAULT_SOFT_TTL, hard_ttl: float = DEFAULT_HARD_TTL):
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = max(hard_ttl, soft_ttl)
+
+    @classmethod
+    def from_settings(cls, settings: Dict) -> "CachePolicy":
+        """Build a policy from a manager's settings block."""
+        return cls(
+            soft_ttl=settings.get('cache_duration', DEFAULT_SOFT_TTL),
+            hard_ttl=settings.get('cache_max_age', DEFAULT_HARD_TTL)
+        )
+
+    @staticmethod
+    def _timestamp(value) -> Optional[float]:
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, str):
+            try:
+                return datetime.fromisoformat(value).timestamp()
+            except ValueError:
+                return None
+        return None
+
+    def age(self, entry: Optional[Dict], timestamp_key: str = 'cached_at') -> Optional[float]:
+        """Seconds since the entry was cached, or None if it has no timestamp."""
+        if not entry:
+            return None
+        cached_at = self._timestamp(entry.get(timestamp_key))
+        return None if cached_at is None else time.time() - cached_at
+
+    def state(self, entry: Optional[Dict], timestamp_key: str = 'cached_at') -> Optional[str]:
+        """FRESH, STALE or EXPIRED; None when there is nothing cached."""
+        age = self.age(entry, timestamp_key)
+        if age is None:
+            return None
+        if age <= entry.get('soft_ttl', self.soft_ttl):
+            return FRESH
+        if age <= entry.get('hard_ttl', self.hard_ttl):
+            return STALE
+        return EXPIRED
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Citation History
+Append-only time series of Scholar profile metrics and per-publication citation counts.
+
+Each sync is recorded as a run, and a value is stored only when it differs
+from the series' previous value, so a daily sync of an unchanged profile adds
+a single row. Points are kept in a SQLite table clustered by (series, run),
+which makes "latest value", "value as of a date" and "last N changes" index
+range reads: the page generator asks for just the series it displays instead
+of loading the whole history.
+
+Usage:
+    from citation_history import CitationHistory, sparkline_svg
+    with CitationHistory(Path(".scholar_history.db")) as history:
+        history.record({"profile:Citations:all_time": 120, "pub:abc123": 14})
+        history.deltas(["pub:abc123"], days=365)     # {"pub:abc123": (14, 9)}
+        points = history.sparklines(["pub:abc123"])  # {"pub:abc123": [(timestamp, value), ...]}
+        svg = sparkline_svg(points["pub:abc123"])
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SPARKLINE_POINTS = 12
+# SQLite's default limit on bound parameters is 999 in older builds
+QUERY_CHUNK = 500
+
+Point = Tuple[int, int]
+
+
+def _chunks(items: List, size: int = QUERY_CHUNK) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class CitationHistory:
+    """SQLite store of metric values that only grows by the values that changed."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY,
+            recorded_at INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS series (
+            id INTEGER PRIMARY KEY,
+            key TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS points (
+            series_id INTEGER NOT NULL,
+            run_id INTEGER NOT NULL,
+            value INTEGER NOT NULL,
+            PRIMARY KEY (series_id, run_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS runs_recorded_at ON runs (recorded_at);
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.executescript(self.SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _series_ids(self, keys: List[str], create: bool = False) -> Dict[str, int]:
+        if create:
+            self.conn.executemany("INSERT OR IGNORE INTO series (key) VALUES (?)", [(key,) for key in keys])
+        ids = {}
+        for chunk in _chunks(keys):
+            placeholders = ','.join('?' * len(chunk))
+            ids.update(self.conn.execute(f"SELECT key, id FROM series WHERE key IN ({placeholders})", chunk))
+        return ids
+
+    def _values_as_of(self, series_ids: List[int], run_id: Optional[int] = None, earliest: bool = False) -> Dict[int, int]:
+        """Each series' value as of a run (the latest value by default, or the first one with earliest)."""
+        values = {}
+        for chunk in _chunks(series_ids):
+            placeholders = ','.join('?' * len(chunk))
+            # SQLite returns the other columns from the row that holds MAX(run_id)/MIN(run_id)
+            query = (f"SELECT series_id, value, {'MIN' if earliest else 'MAX'}(run_id) "
+                     f"FROM points WHERE series_id IN ({placeholders})")
+            params = list(chunk)
+            if run_id is not None:
+                query += " AND run_id <= ?"
+                params.append(run_id)
+            for series_id, value, _ in self.conn.execute(query + " GROUP BY series_id", params):
+                values[series_id] = value
+        return values
+
+    def record(self, values: Dict[str, int], recorded_at: Optional[float] = None) -> int:
+        """Record one run's values, storing only those that changed; returns how many were stored."""
+        values = {key: int(value) for key, value in values.items() if value is not None}
+        with self.conn:
+            run_id = self.conn.execute(
+                "INSERT INTO runs (recorded_at) VALUES (?)", (int(recorded_at or time.time()),)
+            ).lastrowid
+            ids = self._series_ids(list(values), create=True)
+            latest = self._values_as_of(list(ids.values()))
+            changed = [
+                (ids[key], run_id, value) for key, value in values.items()
+                if latest.get(ids[key]) != value
+            ]
+            self.conn.executemany("INSERT INTO points (series_id, run_id, value) VALUES (?, ?, ?)", changed)
+        return len(changed)
+
+    def deltas(self, keys: List[str], days: float = 365) -> Dict[str, Tuple[int, int]]:
+        """(current value, change over the last `days`) for each known key.
+
+        A series that started within the window counts from its first recorded value.
+        """
+        ids = self._series_ids(list(keys))
+        cutoff = self.conn.execute(
+            "SELECT MAX(id) FROM runs WHERE recorded_at <= ?", (int(time.time() - days * 86400),)
+        ).fetchone()[0]
+        current = self._values_as_of(list(ids.values()))
+        past = self._values_as_of(list(ids.values()), earliest=True)
+        if cutoff is not None:
+            past.update(self._values_as_of(list(ids.values()), cutoff))
+        return {
+            key: (current[series_id], current[series_id] - past[series_id])
+            for key, series_id in ids.items() if series_id in current
+        }
+
+    def sparklines(self, keys: List[str], points: int = SPARKLINE_POINTS) -> Dict[str, List[Point]]:
+        """The last `points` changes of each key as (timestamp, value), oldest first."""
+        ids = self._series_ids(list(keys))
+        names = {series_id: key for key, series_id in ids.items()}
+        lines: Dict[str, List[Point]] = {}
+        for chunk in _chunks(list(names)):
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(f"""
+                SELECT p.series_id, r.recorded_at, p.value FROM (
+                    SELECT series_id, run_id, value,
+                           ROW_NUMBER() OVER (PARTITION BY series_id ORDER BY run_id DESC) AS recent
+                    FROM points WHERE series_id IN ({placeholders})
+                ) p JOIN runs r ON r.id = p.run_id
+                WHERE p.recent <= ?
+                ORDER BY p.series_id, p.run_id
+            """, [*chunk, points])
+            for series_id, recorded_at, value in rows:
+                lines.setdefault(names[series_id], []).append((recorded_at, value))
+        return lines
+
+    def stats(self) -> Dict:
+        runs, first, last = self.conn.execute("SELECT COUNT(*), MIN(recorded_at), MAX(recorded_at) FROM runs").fetchone()
+        return {
+            "runs": runs,
+            "series": self.conn.execute("SELECT COUNT(*) FROM series").fetchone()[0],
+            "points": self.conn.execute("SELECT COUNT(*) FROM points").fetchone()[0],
+            "first": first,
+            "last": last,
+        }
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def sparkline_svg(points: List[Point], width: int = 80, height: int = 20, now: Optional[float] = None) -> str:
+    """Inline SVG step line of (timestamp, value) points, held flat up to now; empty for fewer than two changes."""
+    if len(points) < 2:
+        return ''
+    end = max(now or time.time(), points[-1][0])
+    start = points[0][0]
+    low = min(value for _, value in points)
+    high = max(value for _, value in points)
+    span_x = max(end - start, 1)
+    span_y = max(high - low, 1)
+
+    def x(timestamp):
+        return round((timestamp - start) / span_x * width, 1)
+
+    def y(value):
+        return round(height - 1 - (value - low) / span_y * (height - 2), 1)
+
+    coords = [f"{x(points[0][0])},{y(points[0][1])}"]
+    for (_, previous), (timestamp, value) in zip(points, points[1:]):
+        coords.append(f"{x(timestamp)},{y(previous)}")
+        coords.append(f"{x(timestamp)},{y(value)}")
+    coords.append(f"{width},{y(points[-1][1])}")
+    return (f'<svg class="pub-sparkline" width="{width}" height="{height}" viewBox="0 0 {width} {height}" '
+            f'role="img" aria-label="Citations over time from {points[0][1]} to {points[-1][1]}">'
+            f'<polyline fill="none" stroke="currentColor" stroke-width="1.5" points="{" ".join(coords)}"/></svg>')
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Lightweight image header reader for the photography gallery.
+
+Pulls dimensions and the handful of EXIF tags used by photo_manager.py straight
+from the container headers (JPEG APP1/SOF markers, PNG IHDR/eXIf chunks and
+WebP VP8X/VP8/VP8L/EXIF chunks) without decoding pixel data or going through
+Pillow's plugin registry. Only the bytes that are actually needed are read:
+IFD entries are fetched with small seeks instead of loading the whole EXIF
+segment, so a typical photo costs a few KB of I/O.
+
+Usage:
+    from exif_reader import read_image_header
+    header = read_image_header(Path("gallery/images/photo.jpg"))
+    # {"format": "jpeg", "width": 4000, "height": 3000, "exif": {"Make": ..., ...}}
+"""
+
+import struct
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+# EXIF tags we care about, named the same way as PIL.ExifTags.TAGS
+IFD0_TAGS = {
+    0x010F: "Make",
+    0x0110: "Model",
+    0x0132: "DateTime",
+}
+EXIF_IFD_TAGS = {
+    0x829A: "ExposureTime",
+    0x829D: "FNumber",
+    0x8827: "ISOSpeedRatings",
+    0x9003: "DateTimeOriginal",
+    0x920A: "FocalLength",
+    0xA432: "LensSpecification",
+    0xA434: "LensModel",
+}
+EXIF_IFD_POINTER = 0x8769
+
+# TIFF field type -> (struct code, size in bytes)
+TIFF_TYPES = {
+    1: ("B", 1),   # BYTE
+    2: ("s", 1),   # ASCII
+    3: ("H", 2),   # SHORT
+    4: ("L", 4),   # LONG
+    5: ("LL", 8),  # RATIONAL
+    7: ("B", 1),   # UNDEFINED
+    9: ("l", 4),   # SLONG
+    10: ("ll", 8), # SRATIONAL
+}
+
+# SOFn markers carry the frame size; C4 (DHT), C8 (JPG) and CC (DAC) do not
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+MAX_IFD_ENTRIES = 512
+MAX_VALUE_BYTES = 4096
+
+
+class HeaderError(Exception):
+    """Raised when an image header is truncated or malformed."""
+
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise HeaderError("Unexpected end of file")
+    return data
+
+
+class _TiffReader:
+    """Reads selected tags from a TIFF structure embedded at `base` in an open file."""
+
+    def __init__(self, f: BinaryIO, base: int):
+        self.f = f
+        self.base = base
+        byte_order = self._read(0, 2)
+        if byte_order == b"II":
+            self.endian = "<"
+        elif byte_order == b"MM":
+            self.endian = ">"
+        else:
+            raise HeaderError("Invalid TIFF byte order")
+        magic, self.ifd0_offset = struct.unpack(self.endian + "HL", self._read(2, 6))
+        if magic != 42:
+            raise HeaderError("Invalid TIFF magic number")
+
+    def _read(self, offset: int, size: int) -> bytes:
+        self.f.seek(self.base + offset)
+        return _read_exact(self.f, size)
+
+    def _read_value(self, field_type: int, count: int, value_field: bytes):
+        code, size = TIFF_TYPES[field_type]
+        total = size * count
+        if total > MAX_VALUE_BYTES:
+            return None
+        if total <= 4:
+            raw = value_field[:total]
+        else:
+            (offset,) = struct.unpack(self.endian + "L", value_field)
+            raw = self._read(offset, total)
+
+        if field_type == 2:
+            return raw.split(b"\x00", 1)[0].decode("utf-8", errors="replace").strip()
+        if field_type in (5, 10):
+            values = struct.unpack(self.endian + code * count, raw)
+            rationals = []
+            for numerator, denominator in zip(values[::2], values[1::2]):
+                rationals.append(numerator / denominator if denominator else 0.0)
+            return rationals[0] if count == 1 else tuple(rationals)
+        values = struct.unpack(self.endian + code * count, raw)
+        return values[0] if count == 1 else values
+
+    def read_ifd(self, offset: int, wanted: Dict[int, str]) -> Dict:
+        """Read the wanted tags from one IFD; also returns the raw Exif IFD pointer if present."""
+        (entry_count,) = struct.unpack(self.endian + "H", self._read(offset, 2))
+        entry_count = min(entry_count, MAX_IFD_ENTRIES)
+        entries = self._read(offset + 2, entry_count * 12)
+
+        tags = {}
+        for i in range(entry_count):
+            tag, field_type, count = struct.unpack(self.endian + "HHL", entries[i * 12:i * 12 + 8])
+            value_field = entries[i * 12 + 8:i * 12 + 12]
+            if tag == EXIF_IFD_POINTER and field_type in (4, 13):
+                (tags[EXIF_IFD_POINTER],) = struct.unpack(self.endian + "L", value_field)
+            elif tag in wanted and field_type in TIFF_TYPES and count > 0:
+                value = self._read_value(field_type, count, value_field)
+                if value is not None:
+                    tags[wanted[tag]] = value
+        return tags
+
+    def read_tags(self) -> Dict:
+        tags = self.read_ifd(self.ifd0_offset, IFD0_TAGS)
+        exif_offset = tags.pop(EXIF_IFD_POINTER, None)
+        if exif_offset:
+            exif_tags = self.read_ifd(exif_offset, EXIF_IFD_TAGS)
+            exif_tags.pop(EXIF_IFD_POINTER, None)
+            tags.update(exif_tags)
+        return tags
+
+
+def _read_tiff_tags(f: BinaryIO, base: int) -> Dict:
+    """Read EXIF tags from a TIFF block, tolerating an optional 'Exif\\0\\0' prefix."""
+    f.seek(base)
+    if f.read(6) != b"Exif\x00\x00":
+        f.seek(base)
+    else:
+        base += 6
+    try:
+        return _TiffReader(f, base).read_tags()
+    except (HeaderError, struct.error, KeyError):
+        return {}
+
+
+def _read_jpeg(f: BinaryIO) -> Dict:
+    header = {"format": "jpeg", "width": None, "height": None, "exif": {}}
+    f.seek(2)
+
+    while True:
+        marker = _read_exact(f, 2)
+        # Skip fill bytes between segments
+        while marker[0] == 0xFF and marker[1] == 0xFF:
+            marker = marker[1:] + _read_exact(f, 1)
+        if marker[0] != 0xFF:
+            raise HeaderError("Invalid JPEG marker")
+        code = marker[1]
+        if code in (0xD8, 0x01) or 0xD0 <= code <= 0xD7:
+            continue
+        if code in (0xD9, 0xDA):
+            break
+
+        (length,) = struct.unpack(">H", _read_exact(f, 2))
+        segment_start = f.tell()
+
+        if code == 0xE1 and not header["exif"]:
+            header["exif"] = _read_tiff_tags(f, segment_start)
+        elif code in JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">xHH", _read_exact(f, 5))
+            header["width"], header["height"] = width, height
+            # Frame size is the last thing we need; EXIF always precedes SOF
+            break
+
+        f.seek(segment_start + length - 2)
+
+    return header
+
+
+def _read_png(f: BinaryIO) -> Dict:
+    header = {"format": "png", "width": None, "height": None, "exif": {}}
+    f.seek(8)
+
+    while True:
+        chunk_header = f.read(8)
+        if len(chunk_header) < 8:
+            break
+        length, chunk_type = struct.unpack(">L4s", chunk_header)
+        chunk_start = f.tell()
+
+        if chunk_type == b"IHDR":
+            header["width"], header["height"] = struct.unpack(">LL", _read_exact(f, 8))
+        elif chunk_type == b"eXIf":
+            header["exif"] = _read_tiff_tags(f, chunk_start)
+        elif chunk_type in (b"IDAT", b"IEND"):
+            # eXIf must come before image data to be valid
+            break
+
+        f.seek(chunk_start + length + 4)  # skip data and CRC
+
+    return header
+
+
+def _read_webp(f: BinaryIO) -> Dict:
+    header = {"format": "webp", "width": None, "height": None, "exif": {}}
+    f.seek(12)
+
+    while True:
+        chunk_header = f.read(8)
+        if len(chunk_header) < 8:
+            break
+        chunk_type, length = struct.unpack("<4sL", chunk_header)
+        chunk_start = f.tell()
+
+        if chunk_type == b"VP8X":
+            data = _read_exact(f, 10)
+            header["width"] = int.from_bytes(data[4:7], "little") + 1
+            header["height"] = int.from_bytes(data[7:10], "little") + 1
+            if not data[0] & 0x08:
+                # No EXIF flag set, the canvas size is all we need
+                break
+        elif chunk_type == b"VP8 " and header["width"] is None:
+            data = _read_exact(f, 10)
+            if data[3:6] != b"\x9d\x01\x2a":
+                raise HeaderError("Invalid VP8 start code")
+            width, height = struct.unpack("<HH", data[6:10])
+            header["width"], header["height"] = width & 0x3FFF, height & 0x3FFF
+            break
+        elif chunk_type == b"VP8L" and header["width"] is None:
+            data = _read_exact(f, 5)
+            if data[0] != 0x2F:
+                raise HeaderError("Invalid VP8L signature")
+            bits = int.from_bytes(data[1:5], "little")
+            header["width"] = (bits & 0x3FFF) + 1
+            header["height"] = ((bits >> 14) & 0x3FFF) + 1
+            break
+        elif chunk_type == b"EXIF":
+            header["exif"] = _read_tiff_tags(f, chunk_start)
+            break
+
+        f.seek(chunk_start + length + (length & 1))  # chunks are padded to even sizes
+
+    return header
+
+
+def read_image_header(image_path: Path) -> Optional[Dict]:
+    """Read format, dimensions and EXIF tags from an image header.
+
+    Returns None for formats this reader does not understand, so callers can
+    fall back to Pillow. Raises HeaderError for truncated or corrupt files.
+    """
+    with open(image_path, "rb") as f:
+        signature = f.read(12)
+
+        if signature[:3] == b"\xff\xd8\xff":
+            header = _read_jpeg(f)
+        elif signature[:8] == b"\x89PNG\r\n\x1a\n":
+            header = _read_png(f)
+        elif signature[:4] == b"RIFF" and signature[8:12] == b"WEBP":
+            header = _read_webp(f)
+        else:
+            return None
+
+    if not header["width"] or not header["height"]:
+        raise HeaderError(f"No dimensions found in {header['format']} header")
+    return header
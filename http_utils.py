@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+HTTP Utilities
+Pooled HTTP sessions and rate limiting shared by the managers that talk to remote APIs.
+
+A single requests.Session keeps TCP/TLS connections alive between calls, and a
+thread-safe token bucket spaces requests out without the fixed sleep before
+every call. The limiter also reads GitHub-style X-RateLimit-* and Retry-After
+headers, so workers pause until the quota resets instead of failing.
+HostRateLimiter keeps one bucket per host for clients that talk to several sites.
+
+mount_fixtures() puts a session in record or replay mode: recording saves every
+raw response to a directory keyed by method, URL, Accept header, conditional
+headers (If-None-Match/If-Modified-Since) and body, and replay serves them back from disk with no network access and no latency.
+
+Usage:
+    from http_utils import create_session, RateLimiter, HostRateLimiter
+    session = create_session(pool_size=8, headers={"Accept": "application/vnd.github+json"})
+    limiter = RateLimiter(rate=10, burst=8)
+    response = limiter.request(session, "GET", url, timeout=10)
+    response = HostRateLimiter(rate=1).request(session, "GET", url, retries=3, timeout=10)
+    mount_fixtures(session, replay_dir=Path("fixtures"))      # or record_dir=... to capture
+"""
+
+import base64
+import hashlib
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from state_io import load_json, write_json_atomic
+
+# Server errors worth retrying with backoff
+RETRY_STATUSES = {500, 502, 503, 504}
+# Headers describing the wire encoding, which no longer applies to the decoded body stored in a fixture
+WIRE_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+# Request headers that can turn a response into a 304, and so belong in a fixture's key
+CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+
+class RateLimitPaused(requests.RequestException):
+    """The server asked for a pause longer than the limiter's max_wait."""
+
+    def __init__(self, seconds: float):
+        super().__init__(f"Rate limited for another {seconds:.0f}s")
+        self.seconds = seconds
+
+
+def backoff_delay(backoff: float, attempt: int) -> float:
+    """Exponential backoff with jitter: between half and all of backoff * 2**attempt seconds."""
+    delay = backoff * 2 ** attempt
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def retry_after_seconds(headers) -> Optional[float]:
+    """Seconds to wait according to a Retry-After header, in either its seconds or HTTP-date form."""
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def create_session(pool_size: int = 10, headers: Optional[Dict] = None) -> requests.Session:
+    """Create a Session whose connection pool is large enough for pool_size threads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+class RateLimiter:
+    """Token bucket shared by worker threads, aware of server-side rate limit headers.
+
+    A rate of None disables the bucket (e.g. when replaying fixtures) but still honors server pauses.
+    With max_wait, request() hands back a rate limited response instead of waiting longer than that.
+    """
+
+    def __init__(self, rate: Optional[float] = 10.0, burst: int = 1, max_wait: Optional[float] = None):
+        self.rate = rate
+        self.max_wait = max_wait
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0  # wall-clock time, as used by X-RateLimit-Reset
+        self.remaining = None
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent (RateLimitPaused if that would take longer than max_wait)."""
+        while True:
+            with self.lock:
+                pause = self.paused_until - time.time()
+                if self.max_wait is not None and pause > self.max_wait:
+                    raise RateLimitPaused(pause)
+                if pause <= 0 and self.rate is None:
+                    return
+                if pause <= 0:
+                    now = time.monotonic()
+                    self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    pause = (1 - self.tokens) / self.rate
+            time.sleep(pause)
+
+    def pause(self, seconds: float):
+        """Hold back every worker for the given number of seconds."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.time() + seconds)
+
+    def update_from_headers(self, headers):
+        """Pause all workers when the server reports an exhausted quota."""
+        with self.lock:
+            retry_after = retry_after_seconds(headers)
+            if retry_after is not None:
+                self.paused_until = max(self.paused_until, time.time() + retry_after)
+
+            remaining = headers.get("X-RateLimit-Remaining")
+            reset = headers.get("X-RateLimit-Reset")
+            if remaining is None or reset is None:
+                return
+            self.remaining = int(remaining)
+            if self.remaining <= 0:
+                resume_at = float(reset) + 1
+                if resume_at > self.paused_until:
+                    self.paused_until = resume_at
+                    print(f"⏳ Rate limit exhausted, pausing until {time.strftime('%H:%M:%S', time.localtime(resume_at))}")
+
+    @staticmethod
+    def is_rate_limited(response: requests.Response) -> bool:
+        return response.status_code == 429 or (
+            response.status_code == 403 and response.headers.get("X-RateLimit-Remaining") == "0"
+        )
+
+    def request(self, session: requests.Session, method: str, url: str, retries: int = 0,
+                backoff: float = 1.0, **kwargs) -> requests.Response:
+        """Send a request through the limiter.
+
+        A rate limited response is retried after the pause the server asked for, or
+        after an exponential backoff with jitter when it gave none (all workers wait).
+        It is retried up to `retries` times, and at least once. Connection errors,
+        timeouts and 5xx responses are also retried up to `retries` times, with the
+        same backoff.
+        """
+        attempt = 0
+        rate_limit_attempt = 0
+        while True:
+            self.acquire()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= retries:
+                    raise
+                time.sleep(backoff_delay(backoff, attempt))
+                attempt += 1
+                continue
+
+            self.update_from_headers(response.headers)
+            if self.is_rate_limited(response) and rate_limit_attempt < max(retries, 1):
+                wait = self.paused_until - time.time()
+                if self.max_wait is not None and wait > self.max_wait:
+                    return response
+                if wait <= 0:
+                    self.pause(backoff_delay(backoff, rate_limit_attempt))
+                rate_limit_attempt += 1
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < retries:
+                time.sleep(backoff_delay(backoff, attempt))
+                attempt += 1
+                continue
+            return response
+
+
+class HostRateLimiter:
+    """One RateLimiter per host, so a strict host does not throttle requests to the others."""
+
+    def __init__(self, rate: Optional[float] = 10.0, burst: int = 1, host_rates: Optional[Dict[str, float]] = None,
+                 max_wait: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.host_rates = host_rates or {}
+        self.limiters: Dict[str, RateLimiter] = {}
+        self.lock = threading.Lock()
+
+    def for_url(self, url: str) -> RateLimiter:
+        """The limiter for the URL's host, created on first use."""
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            if host not in self.limiters:
+                self.limiters[host] = RateLimiter(rate=self.host_rates.get(host, self.rate), burst=self.burst,
+                                                  max_wait=self.max_wait)
+            return self.limiters[host]
+
+    def request(self, session: requests.Session, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request through the limiter of the URL's host (see RateLimiter.request)."""
+        return self.for_url(url).request(session, method, url, **kwargs)
+
+
+class FixtureMissing(requests.RequestException):
+    """Raised in replay mode for a request that was never recorded (not retried, unlike connection errors)."""
+
+
+def fixture_path(fixture_dir: Path, request: requests.PreparedRequest) -> Path:
+    """Where the response to a request is stored: <host>-<hash of method, URL, Accept, validators and body>.json.
+
+    Conditional headers are part of the key, so a 304 recorded for a revalidation
+    is never replayed to an unconditional request. They are only hashed when
+    present, which keeps the keys of unconditional requests unchanged.
+    """
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.url}\n{request.headers.get('Accept', '')}\n".encode("utf-8"))
+    for header in CONDITIONAL_HEADERS:
+        if request.headers.get(header):
+            digest.update(f"{header}: {request.headers[header]}\n".encode("utf-8"))
+    digest.update(body)
+    host = urlparse(request.url).netloc.replace(":", "_") or "local"
+    return Path(fixture_dir) / f"{host}-{digest.hexdigest()[:24]}.json"
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Sends requests normally and saves every response as a fixture."""
+
+    def __init__(self, fixture_dir: Path, **kwargs):
+        super().__init__(**kwargs)
+        self.fixture_dir = Path(fixture_dir)
+        self.fixture_dir.mkdir(parents=True, exist_ok=True)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        content = response.content
+        try:
+            body = {"text": content.decode("utf-8")}
+        except UnicodeDecodeError:
+            body = {"base64": base64.b64encode(content).decode("ascii")}
+        write_json_atomic(fixture_path(self.fixture_dir, request), {
+            "method": request.method,
+            "url": request.url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {key: value for key, value in response.headers.items() if key.lower() not in WIRE_HEADERS},
+            **body,
+        })
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Answers requests from recorded fixtures without touching the network."""
+
+    def __init__(self, fixture_dir: Path):
+        super().__init__()
+        self.fixture_dir = Path(fixture_dir)
+
+    def send(self, request, **kwargs):
+        path = fixture_path(self.fixture_dir, request)
+        if not path.exists():
+            raise FixtureMissing(f"No recorded response for {request.method} {request.url} in {self.fixture_dir}", request=request)
+        fixture = load_json(path)
+
+        response = requests.Response()
+        response.status_code = fixture["status"]
+        response.reason = fixture.get("reason")
+        response.headers = CaseInsensitiveDict(fixture["headers"])
+        response._content = base64.b64decode(fixture["base64"]) if "base64" in fixture else fixture["text"].encode("utf-8")
+        response.encoding = get_encoding_from_headers(response.headers) or "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def mount_fixtures(session: requests.Session, record_dir: Optional[Path] = None, replay_dir: Optional[Path] = None):
+    """Put a session in record or replay mode (replay wins if both are given)."""
+    if replay_dir:
+        adapter = ReplayAdapter(replay_dir)
+    elif record_dir:
+        pool_size = getattr(session.get_adapter("https://"), "_pool_maxsize", 10)
+        adapter = RecordingAdapter(record_dir, pool_connections=pool_size, pool_maxsize=pool_size)
+    else:
+        return
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+
+def pop_fixture_options(argv: List[str]) -> Dict:
+    """Remove --record DIR / --replay DIR from an argv list and return them as mount_fixtures() keywords."""
+    options = {}
+    for flag, key in (("--record", "record_dir"), ("--replay", "replay_dir")):
+        if flag in argv:
+            index = argv.index(flag)
+            if index + 1 >= len(argv):
+                raise SystemExit(f"{flag} needs a directory")
+            options[key] = Path(argv[index + 1])
+            del argv[index:index + 2]
+    return options
@@ -11,17 +11,19 @@ Usage:
     python linkedin_manager.py preview     # Preview generated HTML sections
     python linkedin_manager.py skills      # Show extracted skills summary
     python linkedin_manager.py list        # List all current profile data
+    python linkedin_manager.py prune --dry-run # Show which old backups would be deleted
 """
 
 import os
 import sys
-import json
 import re
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 import shutil
+from backup_retention import parse_retention_options, prune_backups
+from state_io import load_json, save_json
 
 class LinkedInManager:
     def __init__(self):
@@ -40,8 +42,7 @@ class LinkedInManager:
             return self.create_default_profile()
         
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_json(self.config_file)
         except Exception as e:
             print(f"Error loading profile data: {e}")
             return self.create_default_profile()
@@ -69,8 +70,7 @@ class LinkedInManager:
     def save_profile_data(self):
         """Save profile data to file."""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.profile_data, f, indent=2, ensure_ascii=False)
+            save_json(self.config_file, self.profile_data)
         except Exception as e:
             print(f"Error saving profile data: {e}")
     
@@ -1007,6 +1007,9 @@ def main():
     elif command == 'list':
         manager.list_profile_data()
         
+    elif command == 'prune':
+        prune_backups(manager.backup_dir, **parse_retention_options(sys.argv[2:]))
+        
     else:
         print(f"Unknown command: {command}")
         print(__doc__)
@@ -7,14 +7,15 @@ Usage:
     python onesite_manager.py scan              # Scan and detect all one-page sites
     python onesite_manager.py list              # Show all detected sites
     python onesite_manager.py update            # Update metadata for all sites
+    python onesite_manager.py refresh           # Re-extract only stale entries, leave expired ones to update
     python onesite_manager.py generate          # Generate HTML section for main website
     python onesite_manager.py descriptions      # Manage custom descriptions interactively
     python onesite_manager.py validate          # Validate all sites and configurations
+    python onesite_manager.py prune --dry-run   # Show which old backups would be deleted
 """
 
 import os
 import sys
-import json
 import re
 import time
 from datetime import datetime, timedelta
@@ -22,6 +23,12 @@ from pathlib import Path
 from typing import List, Dict, Optional
 from html.parser import HTMLParser
 import shutil
+from backup_retention import parse_retention_options, prune_backups
+from state_io import batch_writes, load_json, save_json
+from cache_policy import CachePolicy, FRESH, STALE
+
+# Loops over sites write the cache once at the end, plus a checkpoint every N saves
+CACHE_CHECKPOINT_EVERY = 25
 
 class TitleExtractor(HTMLParser):
     """HTML parser to extract title from HTML files."""
@@ -60,6 +67,7 @@ class OnesiteManager:
         
         # Load configuration and cache
         self.config = self.load_config()
+        self.cache_policy = CachePolicy.from_settings(self.config.get('settings', {}))
         self.cache = self.load_cache()
         
     def load_config(self) -> Dict:
@@ -68,8 +76,7 @@ class OnesiteManager:
             return self.create_default_config()
         
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_json(self.config_file)
         except Exception as e:
             print(f"Error loading config: {e}")
             return self.create_default_config()
@@ -80,6 +87,7 @@ class OnesiteManager:
             "settings": {
                 "auto_scan": True,
                 "cache_duration": 86400,  # 24 hours
+                "cache_max_age": 2592000,  # 30 days
                 "onesite_dir": "one_page_websites",
                 "section_title": "One Page Websites",
                 "section_description": "Interactive explorations on various topics that interest me."
@@ -101,8 +109,7 @@ class OnesiteManager:
             config = self.config
             
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            save_json(self.config_file, config)
         except Exception as e:
             print(f"Error saving config: {e}")
     
@@ -112,19 +119,8 @@ class OnesiteManager:
             return {}
         
         try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                cache = json.load(f)
-            
-            # Clean expired cache entries
-            current_time = time.time()
-            cache_duration = self.config.get('settings', {}).get('cache_duration', 86400)
-            
-            for site_file in list(cache.keys()):
-                if 'cached_at' in cache[site_file]:
-                    if current_time - cache[site_file]['cached_at'] > cache_duration:
-                        del cache[site_file]
-            
-            return cache
+            # Expired entries are kept and re-extracted lazily (see get_site_data)
+            return load_json(self.cache_file)
         except Exception as e:
             print(f"Error loading cache: {e}")
             return {}
@@ -132,8 +128,7 @@ class OnesiteManager:
     def save_cache(self):
         """Save cache to file."""
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, indent=2, ensure_ascii=False)
+            save_json(self.cache_file, self.cache, compact=True)
         except Exception as e:
             print(f"Error saving cache: {e}")
     
@@ -202,6 +197,7 @@ class OnesiteManager:
             print("\nOperation cancelled.")
             return existing_description if existing_description else ''
     
+    @batch_writes(checkpoint_every=CACHE_CHECKPOINT_EVERY)
     def scan_onesites(self) -> List[Dict]:
         """Scan the one_page_websites directory for numbered HTML files."""
         if not self.onesite_dir.exists():
@@ -226,12 +222,13 @@ class OnesiteManager:
         """Get site data from cache or extract fresh data."""
         file_key = str(file_path)
         
-        # Check cache first
-        if not force_update and file_key in self.cache:
+        # Check cache first; stale entries are served until the next update/refresh
+        state = self.cache_policy.state(self.cache.get(file_key))
+        if not force_update and state in (FRESH, STALE):
             # Verify file hasn't been modified
             cached_data = self.cache[file_key]
             if cached_data.get('file_mtime') == file_path.stat().st_mtime:
-                print(f"Using cached data for {file_path.name}")
+                print(f"Using {'stale ' if state == STALE else ''}cached data for {file_path.name}")
                 return cached_data
         
         # Extract fresh data
@@ -301,8 +298,13 @@ class OnesiteManager:
             desc_status = "Has description" if custom_descriptions.get(site['filename'], '').strip() else "No description"
             print(f"{site['number']:<3} {site['filename']:<15} {desc_status}")
     
-    def update_sites(self, force: bool = False):
-        """Update metadata for all one-page websites."""
+    @batch_writes(checkpoint_every=CACHE_CHECKPOINT_EVERY)
+    def update_sites(self, force: bool = False, stale_only: bool = False):
+        """Update metadata for all one-page websites.
+        
+        With stale_only (the refresh command) only STALE entries are
+        re-extracted; expired or uncached sites are left for update.
+        """
         sites = self.scan_onesites()
         
         if not sites:
@@ -316,7 +318,11 @@ class OnesiteManager:
             file_path = Path(site['file_path'])
             print(f"[{site['number']}] Updating {file_path.name}")
             
-            updated_data = self.get_site_data(file_path, force_update=force)
+            state = self.cache_policy.state(self.cache.get(str(file_path)))
+            if stale_only and state not in (FRESH, STALE):
+                print(f"  ⏭️  Skipping ({state or 'not cached'}, run 'update' to extract it)")
+                continue
+            updated_data = self.get_site_data(file_path, force_update=force or state != FRESH)
             if updated_data:
                 updated_count += 1
             else:
@@ -553,6 +559,9 @@ def main():
         force = '--force' in sys.argv
         manager.update_sites(force=force)
         
+    elif command == 'refresh':
+        manager.update_sites(stale_only=True)
+        
     elif command == 'generate':
         manager.generate_index_page()
         
@@ -562,6 +571,9 @@ def main():
     elif command == 'validate':
         manager.validate_sites()
         
+    elif command == 'prune':
+        prune_backups(manager.backup_dir, **parse_retention_options(sys.argv[2:]))
+        
     else:
         print(f"Unknown command: {command}")
         print(__doc__)
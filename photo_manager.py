@@ -11,10 +11,18 @@ Usage:
     python photo_manager.py preview                # Preview rename operations
     python photo_manager.py rename                 # Smart batch renaming
     python photo_manager.py rename --preview       # Show rename plan only
+    python photo_manager.py recover                # Finish a rename interrupted by a crash
+    python photo_manager.py recover --abort        # Undo an interrupted rename instead
     python photo_manager.py add PATH               # Add new photos
     python photo_manager.py extract-exif           # Extract EXIF metadata from all photos
+    python photo_manager.py extract-exif --workers N  # Limit the EXIF worker pool size
+    python photo_manager.py extract-exif --hash    # Match cached EXIF data by content hash too
+    python photo_manager.py benchmark-exif         # Compare header-only EXIF reader with Pillow
+    python photo_manager.py derive                 # Generate responsive WebP/JPEG derivatives
+    python photo_manager.py placeholders           # Generate blurred LQIP placeholders for first paint
     python photo_manager.py remove --photo ID      # Remove photos with backups
     python photo_manager.py rollback --backup DIR  # Rollback to backup
+    python photo_manager.py prune --dry-run        # Show which old backups would be deleted
 """
 
 import os
@@ -22,20 +30,434 @@ import sys
 import json
 import re
 import shutil
+import sqlite3
+import hashlib
+import base64
+import io
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 import argparse
-from PIL import Image
+import math
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps
+
+try:
+    import fcntl
+except ImportError:  # Windows: no reflink support, hardlinks/copies only
+    fcntl = None
 from PIL.ExifTags import TAGS
+from exif_reader import read_image_header
+from backup_retention import add_retention_arguments, prune_backups, retention_options
+from state_io import fsync_dir, flush_writes, is_pending, load_json, save_json, write_json_atomic
+
+# Bump when extract_exif_data output changes so stale cache entries are ignored
+EXIF_CACHE_KIND = "exif-v1"
+
+# Linux ioctl for copy-on-write file clones (_IOW(0x94, 9, int))
+FICLONE = 0x40049409
+
+# Gallery snapshot manifest written into every backup directory
+SNAPSHOT_MANIFEST = "manifest.json"
+
+# Low-quality image placeholders: longest edge in pixels and cache namespace
+PLACEHOLDER_SIZE = 20
+PLACEHOLDER_CACHE_KIND = f"placeholder-v1-{PLACEHOLDER_SIZE}"
+
+# Responsive derivatives: target widths and encoder settings per output format
+DERIVATIVE_WIDTHS = [320, 640, 1280, 2048]
+DERIVATIVE_FORMATS = {
+    "webp": {"format": "WEBP", "extension": ".webp", "options": {"quality": 80, "method": 4}},
+    "jpeg": {"format": "JPEG", "extension": ".jpg", "options": {"quality": 82, "optimize": True, "progressive": True}},
+    "avif": {"format": "AVIF", "extension": ".avif", "options": {"quality": 60}},
+}
+
+
+def _default_exif_data() -> Dict:
+    """EXIF summary used when a file has no readable metadata."""
+    return {
+        "camera": "Unknown",
+        "lens": "Unknown",
+        "settings": "Unknown",
+        "dimensions": {"width": 1920, "height": 1280},
+        "aspectRatio": 1.5,
+        "dateCreated": None
+    }
+
+
+def _summarize_exif(exif_data: Dict, exif: Dict):
+    """Fill camera, lens, settings and date fields from EXIF tags keyed by name."""
+    # Extract camera information
+    make = exif.get("Make", "").strip()
+    model = exif.get("Model", "").strip()
+    if make and model:
+        # Remove make from model if it's duplicated
+        if make.lower() in model.lower():
+            exif_data["camera"] = model
+        else:
+            exif_data["camera"] = f"{make} {model}"
+    elif model:
+        exif_data["camera"] = model
+    elif make:
+        exif_data["camera"] = make
+    
+    # Extract lens information
+    lens_model = exif.get("LensModel", "").strip()
+    lens_spec = exif.get("LensSpecification")
+    if lens_model:
+        exif_data["lens"] = lens_model
+    elif lens_spec and isinstance(lens_spec, (list, tuple)) and len(lens_spec) >= 2:
+        focal_min, focal_max = lens_spec[0], lens_spec[1]
+        if focal_min == focal_max:
+            exif_data["lens"] = f"{focal_min}mm"
+        else:
+            exif_data["lens"] = f"{focal_min}-{focal_max}mm"
+    
+    # Extract camera settings
+    settings_parts = []
+    
+    # ISO
+    iso = exif.get("ISOSpeedRatings") or exif.get("ISO")
+    if iso:
+        settings_parts.append(f"ISO {iso}")
+    
+    # Aperture (f-stop)
+    aperture = exif.get("FNumber")
+    if aperture:
+        if isinstance(aperture, (list, tuple)) and len(aperture) >= 2:
+            f_value = aperture[0] / aperture[1]
+        else:
+            f_value = float(aperture)
+        settings_parts.append(f"f/{f_value:.1f}")
+    
+    # Shutter speed
+    shutter = exif.get("ExposureTime")
+    if shutter:
+        if isinstance(shutter, (list, tuple)) and len(shutter) >= 2:
+            shutter_value = shutter[0] / shutter[1]
+            if shutter_value >= 1:
+                settings_parts.append(f"{shutter_value:.1f}s")
+            else:
+                settings_parts.append(f"1/{int(1/shutter_value)}s")
+        else:
+            shutter_value = float(shutter)
+            if shutter_value >= 1:
+                settings_parts.append(f"{shutter_value:.1f}s")
+            else:
+                settings_parts.append(f"1/{int(1/shutter_value)}s")
+    
+    # Focal length
+    focal_length = exif.get("FocalLength")
+    if focal_length:
+        if isinstance(focal_length, (list, tuple)) and len(focal_length) >= 2:
+            focal_value = focal_length[0] / focal_length[1]
+        else:
+            focal_value = float(focal_length)
+        settings_parts.append(f"{focal_value:.0f}mm")
+    
+    if settings_parts:
+        exif_data["settings"] = " • ".join(settings_parts)
+    
+    # Extract date created
+    date_taken = exif.get("DateTimeOriginal") or exif.get("DateTime")
+    if date_taken:
+        try:
+            # Parse EXIF date format: "YYYY:MM:DD HH:MM:SS"
+            date_obj = datetime.strptime(date_taken, "%Y:%m:%d %H:%M:%S")
+            exif_data["dateCreated"] = date_obj.strftime("%Y-%m-%d")
+        except ValueError:
+            pass  # Keep None if parsing fails
+
+
+def extract_exif_data_pillow(image_path: Path) -> Dict:
+    """Extract EXIF metadata by opening the image with Pillow."""
+    exif_data = _default_exif_data()
+    
+    try:
+        with Image.open(image_path) as img:
+            # Get actual image dimensions
+            width, height = img.size
+            exif_data["dimensions"] = {"width": width, "height": height}
+            exif_data["aspectRatio"] = round(width / height, 2)
+            
+            # Extract EXIF data
+            exif_dict = img._getexif()
+            if exif_dict is not None:
+                exif = {}
+                for tag_id, value in exif_dict.items():
+                    tag = TAGS.get(tag_id, tag_id)
+                    exif[tag] = value
+                
+                _summarize_exif(exif_data, exif)
+            
+    except Exception as e:
+        print(f"⚠️  Could not extract EXIF data: {e}")
+    
+    return exif_data
+
+
+def extract_exif_data(image_path: Path) -> Dict:
+    """Extract EXIF metadata from image file.
+
+    JPEG, PNG and WebP headers are parsed directly by exif_reader, which never
+    touches pixel data; anything else (or a header it cannot make sense of)
+    goes through Pillow. Defined at module level so it can be shipped to
+    worker processes by the parallel EXIF extraction mode.
+    """
+    try:
+        header = read_image_header(image_path)
+        if header is None:
+            return extract_exif_data_pillow(image_path)
+        
+        exif_data = _default_exif_data()
+        width, height = header["width"], header["height"]
+        exif_data["dimensions"] = {"width": width, "height": height}
+        exif_data["aspectRatio"] = round(width / height, 2)
+        _summarize_exif(exif_data, header["exif"])
+        return exif_data
+    except Exception:
+        return extract_exif_data_pillow(image_path)
+
+
+def clone_file(source: Path, destination: Path) -> str:
+    """Copy a file as cheaply as the filesystem allows, returning the method used.
+    
+    Tries a copy-on-write reflink first (Btrfs, XFS, APFS-style clones via
+    FICLONE on Linux), then a hardlink, and finally a regular copy. Hardlinks
+    share the inode with the source, so this is only safe for files that are
+    replaced rather than rewritten in place: the managers rename, delete or
+    add gallery images, and generate_derivatives writes each derivative to a
+    temporary file and os.replace()s it over the old one.
+    """
+    if fcntl is not None:
+        try:
+            with open(source, 'rb') as src, open(destination, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            shutil.copystat(source, destination)
+            return "reflink"
+        except OSError:
+            destination.unlink(missing_ok=True)
+    
+    try:
+        os.link(source, destination)
+        return "hardlink"
+    except OSError:
+        shutil.copy2(source, destination)
+        return "copy"
+
+
+def _extract_exif_worker(image_path: str) -> Dict:
+    """Process pool entry point for parallel EXIF extraction."""
+    return extract_exif_data(Path(image_path))
+
+
+def iter_exif_data(image_paths: List[Path], workers: Optional[int] = None) -> Iterator[Dict]:
+    """Yield EXIF data for each path, in input order.
+
+    With more than one worker the files are spread over a process pool and
+    results are streamed back as soon as the next one in order is ready, so
+    callers can report progress while the rest of the gallery is still
+    being read.
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(image_paths)) if image_paths else 1
+
+    if workers <= 1:
+        for image_path in image_paths:
+            yield extract_exif_data(image_path)
+        return
+
+    chunksize = max(1, len(image_paths) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_extract_exif_worker, [str(p) for p in image_paths], chunksize=chunksize)
+
+
+def generate_derivatives(image_path: str, output_dir: str, widths: List[int], formats: List[str]) -> Dict:
+    """Write resized copies of one image and return its srcset table.
+    
+    Widths at or above the source width are skipped; a source narrower than
+    the largest target also gets a re-encoded copy at its own width. JPEG
+    sources are decoded at reduced scale via Pillow's draft mode, so pixels
+    are only decoded at the largest size actually needed. Derivative names
+    keep the source extension (a-jpg-800.webp), so a.jpg and a.png never
+    write over each other's files.
+    """
+    source = Path(image_path)
+    output = Path(output_dir)
+    srcset = {fmt: [] for fmt in formats}
+    name_prefix = f"{source.stem}-{source.suffix.lstrip('.').lower()}"
+    
+    with Image.open(source) as img:
+        orientation = img.getexif().get(0x0112, 1)
+        raw_width, raw_height = img.size
+        width, height = (raw_height, raw_width) if orientation in (5, 6, 7, 8) else (raw_width, raw_height)
+        
+        targets = sorted({w for w in widths if w < width} | ({width} if width < max(widths) else set()))
+        if not targets:
+            return {"width": width, "height": height, "srcset": srcset}
+        
+        scale = max(targets) / width
+        img.draft("RGB", (math.ceil(raw_width * scale), math.ceil(raw_height * scale)))
+        base = ImageOps.exif_transpose(img)
+        if base.mode not in ("RGB", "RGBA"):
+            base = base.convert("RGBA" if "A" in base.getbands() else "RGB")
+        
+        for target_width in reversed(targets):
+            target_height = max(1, round(height * target_width / width))
+            resized = base.resize((target_width, target_height), Image.LANCZOS)
+            
+            for fmt in formats:
+                spec = DERIVATIVE_FORMATS[fmt]
+                frame = resized.convert("RGB") if spec["format"] == "JPEG" and resized.mode != "RGB" else resized
+                filename = f"{name_prefix}-{target_width}{spec['extension']}"
+                # Write beside the target and swap it in: a backup snapshot may
+                # hardlink the old derivative, and saving over it would change the backup too
+                temp_path = output / f".{filename}.{os.getpid()}.tmp"
+                try:
+                    frame.save(temp_path, spec["format"], **spec["options"])
+                    os.replace(temp_path, output / filename)
+                except BaseException:
+                    temp_path.unlink(missing_ok=True)
+                    raise
+                srcset[fmt].insert(0, {"width": target_width, "file": filename})
+    
+    return {"width": width, "height": height, "srcset": srcset}
+
+
+def _derive_worker(job: Tuple[str, str, List[int], List[str]]) -> Dict:
+    """Process pool entry point for derivative generation."""
+    try:
+        return generate_derivatives(*job)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def generate_placeholder(image_path: Path, size: int = PLACEHOLDER_SIZE) -> str:
+    """Return a tiny base64 WebP data URI of the image for use as an LQIP.
+    
+    JPEG sources are decoded at 1/8 scale through draft mode, so this costs
+    a fraction of a full decode even for large photos.
+    """
+    with Image.open(image_path) as img:
+        img.draft("RGB", (size * 4, size * 4))
+        thumb = ImageOps.exif_transpose(img).convert("RGB")
+        thumb.thumbnail((size, size), Image.LANCZOS)
+        buffer = io.BytesIO()
+        thumb.save(buffer, "WEBP", quality=40, method=6)
+    return "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def _placeholder_worker(image_path: str) -> Dict:
+    """Process pool entry point for placeholder generation."""
+    try:
+        return {"placeholder": generate_placeholder(Path(image_path))}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+class PhotoCache:
+    """Sidecar SQLite cache of per-file results for the gallery.
+    
+    Entries are stored per (kind, path) together with the file's size and
+    mtime, so an unchanged file is recognised from a single stat() call. With
+    `use_hash` enabled a content digest is stored as well, letting renamed,
+    copied or merely touched files hit the cache by content.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            kind TEXT NOT NULL,
+            path TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            digest TEXT,
+            data TEXT NOT NULL,
+            PRIMARY KEY (kind, path)
+        );
+        CREATE INDEX IF NOT EXISTS entries_digest ON entries (kind, digest);
+    """
+    
+    def __init__(self, db_path: Path, use_hash: bool = False):
+        self.db_path = db_path
+        self.use_hash = use_hash
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.executescript(self.SCHEMA)
+    
+    @staticmethod
+    def _key(path: Path) -> str:
+        return str(Path(path).resolve())
+    
+    @staticmethod
+    def file_digest(path: Path) -> str:
+        """Hash file contents in 1 MB blocks."""
+        digest = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def get(self, kind: str, path: Path) -> Optional[Dict]:
+        """Return cached data for an unchanged file, or None on a miss."""
+        try:
+            stat = Path(path).stat()
+        except OSError:
+            self.misses += 1
+            return None
+        
+        key = self._key(path)
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, data FROM entries WHERE kind = ? AND path = ?", (kind, key)
+        ).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            self.hits += 1
+            return json.loads(row[2])
+        
+        if self.use_hash:
+            digest = self.file_digest(path)
+            row = self.conn.execute(
+                "SELECT data FROM entries WHERE kind = ? AND digest = ? LIMIT 1", (kind, digest)
+            ).fetchone()
+            if row:
+                self.hits += 1
+                data = json.loads(row[0])
+                self._store(kind, key, stat, digest, row[0])
+                return data
+        
+        self.misses += 1
+        return None
+    
+    def put(self, kind: str, path: Path, data: Dict):
+        """Store data for a file under its current size/mtime (and digest)."""
+        try:
+            stat = Path(path).stat()
+        except OSError:
+            return
+        digest = self.file_digest(path) if self.use_hash else None
+        self._store(kind, self._key(path), stat, digest, json.dumps(data, ensure_ascii=False))
+    
+    def _store(self, kind: str, key: str, stat: os.stat_result, digest: Optional[str], payload: str):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO entries (kind, path, size, mtime_ns, digest, data) VALUES (?, ?, ?, ?, ?, ?)",
+            (kind, key, stat.st_size, stat.st_mtime_ns, digest, payload)
+        )
+    
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
 
 class PhotoManager:
     def __init__(self):
         self.base_dir = Path(".")
         self.gallery_dir = Path("gallery")
         self.images_dir = self.gallery_dir / "images"
+        self.derived_dir = self.gallery_dir / "derived"
         self.metadata_file = self.gallery_dir / "metadata.json"
+        self.cache_file = Path(".photo_cache.db")
+        self.rename_journal = Path(".photo_rename_journal.json")
         self.backup_dir = Path(".backups")
         self.backup_dir.mkdir(exist_ok=True)
         
@@ -44,116 +466,12 @@ class PhotoManager:
     
     def extract_exif_data(self, image_path: Path) -> Dict:
         """Extract EXIF metadata from image file."""
-        exif_data = {
-            "camera": "Unknown",
-            "lens": "Unknown",
-            "settings": "Unknown",
-            "dimensions": {"width": 1920, "height": 1280},
-            "aspectRatio": 1.5,
-            "dateCreated": None
-        }
-        
-        try:
-            with Image.open(image_path) as img:
-                # Get actual image dimensions
-                width, height = img.size
-                exif_data["dimensions"] = {"width": width, "height": height}
-                exif_data["aspectRatio"] = round(width / height, 2)
-                
-                # Extract EXIF data
-                exif_dict = img._getexif()
-                if exif_dict is not None:
-                    exif = {}
-                    for tag_id, value in exif_dict.items():
-                        tag = TAGS.get(tag_id, tag_id)
-                        exif[tag] = value
-                    
-                    # Extract camera information
-                    make = exif.get("Make", "").strip()
-                    model = exif.get("Model", "").strip()
-                    if make and model:
-                        # Remove make from model if it's duplicated
-                        if make.lower() in model.lower():
-                            exif_data["camera"] = model
-                        else:
-                            exif_data["camera"] = f"{make} {model}"
-                    elif model:
-                        exif_data["camera"] = model
-                    elif make:
-                        exif_data["camera"] = make
-                    
-                    # Extract lens information
-                    lens_model = exif.get("LensModel", "").strip()
-                    lens_spec = exif.get("LensSpecification")
-                    if lens_model:
-                        exif_data["lens"] = lens_model
-                    elif lens_spec and isinstance(lens_spec, (list, tuple)) and len(lens_spec) >= 2:
-                        focal_min, focal_max = lens_spec[0], lens_spec[1]
-                        if focal_min == focal_max:
-                            exif_data["lens"] = f"{focal_min}mm"
-                        else:
-                            exif_data["lens"] = f"{focal_min}-{focal_max}mm"
-                    
-                    # Extract camera settings
-                    settings_parts = []
-                    
-                    # ISO
-                    iso = exif.get("ISOSpeedRatings") or exif.get("ISO")
-                    if iso:
-                        settings_parts.append(f"ISO {iso}")
-                    
-                    # Aperture (f-stop)
-                    aperture = exif.get("FNumber")
-                    if aperture:
-                        if isinstance(aperture, (list, tuple)) and len(aperture) >= 2:
-                            f_value = aperture[0] / aperture[1]
-                        else:
-                            f_value = float(aperture)
-                        settings_parts.append(f"f/{f_value:.1f}")
-                    
-                    # Shutter speed
-                    shutter = exif.get("ExposureTime")
-                    if shutter:
-                        if isinstance(shutter, (list, tuple)) and len(shutter) >= 2:
-                            shutter_value = shutter[0] / shutter[1]
-                            if shutter_value >= 1:
-                                settings_parts.append(f"{shutter_value:.1f}s")
-                            else:
-                                settings_parts.append(f"1/{int(1/shutter_value)}s")
-                        else:
-                            shutter_value = float(shutter)
-                            if shutter_value >= 1:
-                                settings_parts.append(f"{shutter_value:.1f}s")
-                            else:
-                                settings_parts.append(f"1/{int(1/shutter_value)}s")
-                    
-                    # Focal length
-                    focal_length = exif.get("FocalLength")
-                    if focal_length:
-                        if isinstance(focal_length, (list, tuple)) and len(focal_length) >= 2:
-                            focal_value = focal_length[0] / focal_length[1]
-                        else:
-                            focal_value = float(focal_length)
-                        settings_parts.append(f"{focal_value:.0f}mm")
-                    
-                    if settings_parts:
-                        exif_data["settings"] = " • ".join(settings_parts)
-                    
-                    # Extract date created
-                    date_taken = exif.get("DateTimeOriginal") or exif.get("DateTime")
-                    if date_taken:
-                        try:
-                            # Parse EXIF date format: "YYYY:MM:DD HH:MM:SS"
-                            date_obj = datetime.strptime(date_taken, "%Y:%m:%d %H:%M:%S")
-                            exif_data["dateCreated"] = date_obj.strftime("%Y-%m-%d")
-                        except ValueError:
-                            pass  # Keep None if parsing fails
-                
-        except Exception as e:
-            print(f"⚠️  Could not extract EXIF data: {e}")
-        
-        return exif_data
-        
+        return extract_exif_data(image_path)
+    
+    def open_cache(self, use_hash: bool = False) -> PhotoCache:
+        """Open the sidecar cache of per-file extraction results."""
+        return PhotoCache(self.cache_file, use_hash=use_hash)
+    
     def load_metadata(self) -> Dict:
         """Load gallery metadata from JSON file."""
         if not self.metadata_file.exists():
@@ -161,34 +479,70 @@ class PhotoManager:
             return {"gallery": {}, "images": []}
         
         try:
-            with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_json(self.metadata_file)
         except Exception as e:
             print(f"❌ Error loading metadata: {e}")
             return {"gallery": {}, "images": []}
     
-    def save_metadata(self):
-        """Save metadata back to JSON file."""
+    def save_metadata(self) -> bool:
+        """Save metadata back to JSON file, returning False if the save failed."""
         try:
-            # Create backup before saving
-            if self.metadata_file.exists():
+            # Create backup before saving (once per batch of coalesced saves)
+            if self.metadata_file.exists() and not is_pending(self.metadata_file):
                 backup_path = self.backup_dir / f"metadata_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
                 shutil.copy2(self.metadata_file, backup_path)
             
-            with open(self.metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(self.metadata, f, indent=2, ensure_ascii=False)
-            print("✅ Metadata saved successfully")
+            save_json(self.metadata_file, self.metadata, message="✅ Metadata saved successfully")
+            return True
         except Exception as e:
             print(f"❌ Error saving metadata: {e}")
+            return False
     
     def create_backup(self) -> Path:
-        """Create complete backup of gallery directory."""
+        """Snapshot the gallery directory into the backups folder.
+        
+        Image files are reflinked or hardlinked instead of copied, so an
+        unchanged gallery costs almost no time or disk; JSON files are copied
+        because they are rewritten in place. A manifest records the size and
+        mtime of every file so a rollback only restores what changed.
+        """
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         backup_path = self.backup_dir / f"gallery_backup_{timestamp}"
+        counter = 1
+        while backup_path.exists():
+            backup_path = self.backup_dir / f"gallery_backup_{timestamp}_{counter}"
+            counter += 1
         
         try:
-            shutil.copytree(self.gallery_dir, backup_path)
-            print(f"✅ Backup created: {backup_path}")
+            started = time.time()
+            manifest = {"created": datetime.now().isoformat(), "source": str(self.gallery_dir), "files": {}}
+            methods = {}
+            
+            for root, _, files in os.walk(self.gallery_dir):
+                root_path = Path(root)
+                target_dir = backup_path / root_path.relative_to(self.gallery_dir)
+                target_dir.mkdir(parents=True, exist_ok=True)
+                
+                for name in files:
+                    source = root_path / name
+                    target = target_dir / name
+                    if source.suffix.lower() == '.json':
+                        shutil.copy2(source, target)
+                        method = "copy"
+                    else:
+                        method = clone_file(source, target)
+                    
+                    stat = source.stat()
+                    manifest["files"][source.relative_to(self.gallery_dir).as_posix()] = {
+                        "size": stat.st_size,
+                        "mtime_ns": stat.st_mtime_ns
+                    }
+                    methods[method] = methods.get(method, 0) + 1
+            
+            write_json_atomic(backup_path / SNAPSHOT_MANIFEST, manifest)
+            
+            summary = ", ".join(f"{count} {method}" for method, count in sorted(methods.items()))
+            print(f"✅ Backup created: {backup_path} ({summary or 'empty'}, {time.time() - started:.2f}s)")
             return backup_path
         except Exception as e:
             print(f"❌ Error creating backup: {e}")
@@ -572,59 +926,42 @@ class PhotoManager:
         return rename_operations
     
     def execute_rename_operations(self, operations: List[Tuple[str, str]]):
-        """Execute the rename operations with full safety checks."""
+        """Execute the rename operations with full safety checks.
+        
+        Renames are planned into a write-ahead journal before any file is
+        touched, then applied in two phases (sources to temporary names, then
+        temporary names to targets) so swaps and cycles cannot clobber each
+        other. If anything fails, only the files listed in the journal are
+        moved back; an interrupted run can be resumed or undone with the
+        recover command.
+        """
         if not operations:
             print("No rename operations to execute.")
             return
         
-        print(f"\n⚠️  About to rename {len(operations)} files.")
+        if self.rename_journal.exists():
+            print(f"❌ An unfinished rename was found in {self.rename_journal}")
+            print("Run 'python photo_manager.py recover' to finish it, or 'recover --abort' to undo it.")
+            return
+        
+        journal = self._plan_rename(operations)
+        if not journal["operations"]:
+            print("✅ All files already have their target names.")
+            return
+        
+        print(f"\n⚠️  About to rename {len(journal['operations'])} files.")
         confirm = input("This operation will modify files. Continue? (yes/no): ").strip().lower()
         
         if confirm not in ["yes", "y"]:
             print("Operation cancelled.")
             return
         
-        # Create backup
-        backup_path = self.create_backup()
-        if not backup_path:
-            print("❌ Failed to create backup. Aborting rename operation.")
-            return
-        
         try:
-            success_count = 0
+            write_json_atomic(self.rename_journal, journal)
+            print(f"📝 Rename journal written: {self.rename_journal}")
             
-            # Phase 1: Rename physical files
-            print("\nRenaming files...")
-            for current_filename, new_filename in operations:
-                current_path = self.images_dir / current_filename
-                new_path = self.images_dir / new_filename
-                
-                if current_path.exists():
-                    if new_path.exists():
-                        print(f"⚠️  Target file already exists: {new_filename}")
-                        continue
-                    
-                    current_path.rename(new_path)
-                    print(f"  ✅ {current_filename} → {new_filename}")
-                    success_count += 1
-                else:
-                    print(f"  ❌ Source file not found: {current_filename}")
-            
-            # Phase 2: Update metadata
-            print("\nUpdating metadata...")
-            rename_mapping = dict(operations)
-            
-            for photo in self.metadata["images"]:
-                if photo.get("filename") in rename_mapping:
-                    old_filename = photo["filename"]
-                    new_filename = rename_mapping[old_filename]
-                    photo["filename"] = new_filename
-                    print(f"  ✅ Updated metadata: {old_filename} → {new_filename}")
+            self._apply_rename_journal(journal)
             
-            # Save updated metadata
-            self.save_metadata()
-            
-            # Phase 3: Validation
             print("\nValidating changes...")
             issues = self.validate_system()
             
@@ -632,24 +969,191 @@ class PhotoManager:
                 print("❌ Validation failed after rename operation:")
                 for issue in issues:
                     print(f"  - {issue}")
-                print(f"\n🔄 Rolling back to backup: {backup_path}")
-                self._rollback_from_backup(backup_path)
+                print("\n🔄 Undoing renames from journal...")
+                self._undo_rename_journal(journal)
             else:
+                self.rename_journal.unlink()
                 print(f"✅ Rename operation completed successfully!")
-                print(f"✅ {success_count}/{len(operations)} files renamed")
+                print(f"✅ {len(journal['operations'])}/{len(operations)} files renamed")
                 print(f"✅ Metadata updated and validated")
                 
         except Exception as e:
             print(f"❌ Error during rename operation: {e}")
-            print(f"🔄 Rolling back to backup: {backup_path}")
-            self._rollback_from_backup(backup_path)
+            print("🔄 Undoing renames from journal...")
+            self._undo_rename_journal(journal)
+    
+    def _plan_rename(self, operations: List[Tuple[str, str]]) -> Dict:
+        """Turn (current, new) filename pairs into a rename journal."""
+        ids_by_filename = {photo.get("filename"): photo.get("id") for photo in self.metadata.get("images", [])}
+        sources = {current for current, new in operations if current != new}
+        stamp = datetime.now().strftime('%Y%m%d%H%M%S')
+        
+        planned = []
+        for current_filename, new_filename in operations:
+            if current_filename == new_filename:
+                continue
+            if not (self.images_dir / current_filename).exists():
+                print(f"  ❌ Source file not found: {current_filename}")
+                continue
+            if (self.images_dir / new_filename).exists() and new_filename not in sources:
+                print(f"⚠️  Target file already exists: {new_filename}")
+                continue
+            planned.append({
+                "id": ids_by_filename.get(current_filename),
+                "source": current_filename,
+                "temp": f".rename-{stamp}-{len(planned)}{Path(current_filename).suffix}",
+                "target": new_filename
+            })
+        
+        # A target that is another operation's source only frees up if that operation runs too
+        skipped_sources = sources - {op["source"] for op in planned}
+        blocked = [op for op in planned if op["target"] in skipped_sources]
+        while blocked:
+            for op in blocked:
+                print(f"⚠️  Target file already exists: {op['target']}")
+                planned.remove(op)
+                skipped_sources.add(op["source"])
+            blocked = [op for op in planned if op["target"] in skipped_sources]
+        
+        return {"created": datetime.now().isoformat(), "state": "staging", "operations": planned}
+    
+    def _apply_rename_journal(self, journal: Dict):
+        """Roll a rename journal forward from whatever state it was left in."""
+        operations = journal["operations"]
+        
+        if journal["state"] == "staging":
+            print("\nStaging files under temporary names...")
+            for op in operations:
+                source = self.images_dir / op["source"]
+                if source.exists() and not (self.images_dir / op["temp"]).exists():
+                    os.replace(source, self.images_dir / op["temp"])
+            fsync_dir(self.images_dir)
+            journal["state"] = "committing"
+            write_json_atomic(self.rename_journal, journal)
+        
+        if journal["state"] == "committing":
+            print("\nRenaming files...")
+            for op in operations:
+                temp = self.images_dir / op["temp"]
+                if temp.exists():
+                    os.replace(temp, self.images_dir / op["target"])
+                    print(f"  ✅ {op['source']} → {op['target']}")
+            fsync_dir(self.images_dir)
+            journal["state"] = "metadata"
+            write_json_atomic(self.rename_journal, journal)
+        
+        if journal["state"] == "metadata":
+            print("\nUpdating metadata...")
+            self._set_journal_filenames(journal, "target")
+    
+    def _undo_rename_journal(self, journal: Dict):
+        """Move every file in a rename journal back to its original name."""
+        try:
+            operations = journal["operations"]
+            
+            # Targets only exist once the staging phase has moved every source away
+            if journal["state"] in ("committing", "metadata"):
+                for op in operations:
+                    target = self.images_dir / op["target"]
+                    if target.exists() and not (self.images_dir / op["temp"]).exists():
+                        os.replace(target, self.images_dir / op["temp"])
+            
+            restored = 0
+            for op in operations:
+                temp = self.images_dir / op["temp"]
+                if temp.exists():
+                    os.replace(temp, self.images_dir / op["source"])
+                    restored += 1
+            fsync_dir(self.images_dir)
+            
+            if journal["state"] == "metadata":
+                self._set_journal_filenames(journal, "source")
+            else:
+                self.metadata = self.load_metadata()
+            
+            self.rename_journal.unlink(missing_ok=True)
+            print(f"✅ Restored {restored} files to their original names")
+        except Exception as e:
+            print(f"❌ Critical error while undoing renames: {e}")
+            print(f"Journal kept for manual recovery: {self.rename_journal}")
+    
+    def _set_journal_filenames(self, journal: Dict, side: str):
+        """Point metadata entries at the journal's source or target names (idempotent)."""
+        self.metadata = self.load_metadata()
+        by_id = {op["id"]: op for op in journal["operations"] if op["id"] is not None}
+        for photo in self.metadata.get("images", []):
+            op = by_id.get(photo.get("id"))
+            if op and photo.get("filename") != op[side]:
+                photo["filename"] = op[side]
+                print(f"  ✅ Updated metadata: {op['source' if side == 'target' else 'target']} → {op[side]}")
+        # The journal may only be removed once metadata.json is on disk
+        if not self.save_metadata():
+            raise RuntimeError("metadata.json could not be saved")
+        flush_writes()
+    
+    def recover_rename(self, abort: bool = False):
+        """Finish (or with abort, undo) a rename that was interrupted by a crash."""
+        if not self.rename_journal.exists():
+            print("✅ No unfinished rename found")
+            return
+        
+        journal = load_json(self.rename_journal)
+        print(f"📝 Found rename journal from {journal['created']} "
+              f"({len(journal['operations'])} files, state: {journal['state']})")
+        
+        if abort:
+            self._undo_rename_journal(journal)
+            return
+        
+        try:
+            self._apply_rename_journal(journal)
+            self.rename_journal.unlink()
+            print("✅ Interrupted rename completed")
+        except Exception as e:
+            print(f"❌ Error resuming rename: {e}")
+            print("Run 'python photo_manager.py recover --abort' to undo it instead.")
     
     def _rollback_from_backup(self, backup_path: Path):
-        """Rollback gallery to backup state."""
+        """Rollback gallery to backup state.
+        
+        Snapshots with a manifest are restored incrementally: only files that
+        are missing or differ from the manifest are put back, and files added
+        since the snapshot are removed. Older full-copy backups fall back to
+        replacing the whole gallery directory.
+        """
         try:
-            if self.gallery_dir.exists():
-                shutil.rmtree(self.gallery_dir)
-            shutil.copytree(backup_path, self.gallery_dir)
+            manifest_path = backup_path / SNAPSHOT_MANIFEST
+            if not manifest_path.exists():
+                if self.gallery_dir.exists():
+                    shutil.rmtree(self.gallery_dir)
+                shutil.copytree(backup_path, self.gallery_dir)
+            else:
+                manifest = load_json(manifest_path)
+                
+                restored = removed = 0
+                for relative, recorded in manifest["files"].items():
+                    current = self.gallery_dir / relative
+                    if current.exists():
+                        stat = current.stat()
+                        if stat.st_size == recorded["size"] and stat.st_mtime_ns == recorded["mtime_ns"]:
+                            continue
+                        current.unlink()
+                    current.parent.mkdir(parents=True, exist_ok=True)
+                    source = backup_path / relative
+                    if source.suffix.lower() == '.json':
+                        shutil.copy2(source, current)
+                    else:
+                        clone_file(source, current)
+                    restored += 1
+                
+                for root, _, files in os.walk(self.gallery_dir):
+                    for name in files:
+                        current = Path(root) / name
+                        if current.relative_to(self.gallery_dir).as_posix() not in manifest["files"]:
+                            current.unlink()
+                            removed += 1
+                
+                print(f"✅ Restored {restored} files, removed {removed} files added since the snapshot")
             
             # Reload metadata
             self.metadata = self.load_metadata()
@@ -821,17 +1325,62 @@ class PhotoManager:
         else:
             print("\n✅ No generic captions found to update")
     
-    def bulk_extract_exif(self):
-        """Extract EXIF metadata for all existing photos and update their metadata."""
+    def _apply_exif_updates(self, image: Dict, exif_data: Dict) -> List[str]:
+        """Merge extracted EXIF data into a photo entry, returning the updated fields."""
+        updates = []
+        
+        # Update camera info if we got better data
+        old_camera = image.get("metadata", {}).get("camera", "Unknown")
+        if exif_data["camera"] != "Unknown" and (old_camera == "Unknown" or old_camera != exif_data["camera"]):
+            if "metadata" not in image:
+                image["metadata"] = {}
+            image["metadata"]["camera"] = exif_data["camera"]
+            updates.append("camera")
+        
+        # Update lens info
+        old_lens = image.get("metadata", {}).get("lens", "Unknown")
+        if exif_data["lens"] != "Unknown" and (old_lens == "Unknown" or old_lens != exif_data["lens"]):
+            if "metadata" not in image:
+                image["metadata"] = {}
+            image["metadata"]["lens"] = exif_data["lens"]
+            updates.append("lens")
+        
+        # Update settings
+        old_settings = image.get("metadata", {}).get("settings", "Unknown")
+        if exif_data["settings"] != "Unknown" and (old_settings == "Unknown" or old_settings != exif_data["settings"]):
+            if "metadata" not in image:
+                image["metadata"] = {}
+            image["metadata"]["settings"] = exif_data["settings"]
+            updates.append("settings")
+        
+        # Update dimensions if we got actual size
+        old_dimensions = image.get("dimensions", {"width": 1920, "height": 1280})
+        if exif_data["dimensions"]["width"] > 0 and (
+            old_dimensions.get("width", 1920) != exif_data["dimensions"]["width"] or 
+            old_dimensions.get("height", 1280) != exif_data["dimensions"]["height"]
+        ):
+            image["dimensions"] = exif_data["dimensions"]
+            image["aspectRatio"] = exif_data["aspectRatio"]
+            updates.append("dimensions")
+        
+        # Update date if we got EXIF date and don't have one
+        if exif_data["dateCreated"] != "Unknown" and not image.get("dateCreated"):
+            image["dateCreated"] = exif_data["dateCreated"]
+            updates.append("date")
+        
+        return updates
+    
+    def bulk_extract_exif(self, workers: Optional[int] = None, use_cache: bool = True, use_hash: bool = False):
+        """Extract EXIF metadata for all existing photos and update their metadata.
+        
+        Files whose size and mtime match the sidecar cache are served from it;
+        the rest are read by a process pool (one worker per core unless
+        `workers` is given). Results are merged in gallery order, with
+        metadata.json backed up and written once at the end.
+        """
         print("🔍 Extracting EXIF metadata for all photos...")
         print("This will update camera, lens, settings, dimensions, and date information from image files.")
         
-        # Create backup first
-        backup_path = self.create_backup()
-        if not backup_path:
-            print("❌ Failed to create backup. Aborting EXIF extraction.")
-            return
-        
         updated_count = 0
         total_photos = len(self.metadata.get("images", []))
         
@@ -839,9 +1388,12 @@ class PhotoManager:
             print("❌ No photos found in metadata")
             return
         
-        print(f"\n📸 Processing {total_photos} photos...")
+        workers = workers or os.cpu_count() or 1
+        print(f"\n📸 Processing {total_photos} photos with {workers} worker{'s' if workers != 1 else ''}...")
         print("="*80)
         
+        # Collect readable files first so the pool only sees real work
+        jobs = []
         for i, image in enumerate(self.metadata.get("images", []), 1):
             filename = image.get("filename", "")
             if not filename:
@@ -854,67 +1406,51 @@ class PhotoManager:
                 print(f"{i:>3}. ❌ File missing: {filename}")
                 continue
             
-            print(f"{i:>3}. 🔍 {filename[:40]:<42}", end="")
-            
-            # Extract EXIF data 
-            exif_data = self.extract_exif_data(image_path)
-            
-            # Track what was updated
-            updates = []
-            
-            # Update camera info if we got better data
-            old_camera = image.get("metadata", {}).get("camera", "Unknown")
-            if exif_data["camera"] != "Unknown" and (old_camera == "Unknown" or old_camera != exif_data["camera"]):
-                if "metadata" not in image:
-                    image["metadata"] = {}
-                image["metadata"]["camera"] = exif_data["camera"]
-                updates.append("camera")
-            
-            # Update lens info
-            old_lens = image.get("metadata", {}).get("lens", "Unknown")
-            if exif_data["lens"] != "Unknown" and (old_lens == "Unknown" or old_lens != exif_data["lens"]):
-                if "metadata" not in image:
-                    image["metadata"] = {}
-                image["metadata"]["lens"] = exif_data["lens"]
-                updates.append("lens")
-            
-            # Update settings
-            old_settings = image.get("metadata", {}).get("settings", "Unknown")
-            if exif_data["settings"] != "Unknown" and (old_settings == "Unknown" or old_settings != exif_data["settings"]):
-                if "metadata" not in image:
-                    image["metadata"] = {}
-                image["metadata"]["settings"] = exif_data["settings"]
-                updates.append("settings")
-            
-            # Update dimensions if we got actual size
-            old_dimensions = image.get("dimensions", {"width": 1920, "height": 1280})
-            if exif_data["dimensions"]["width"] > 0 and (
-                old_dimensions.get("width", 1920) != exif_data["dimensions"]["width"] or 
-                old_dimensions.get("height", 1280) != exif_data["dimensions"]["height"]
-            ):
-                image["dimensions"] = exif_data["dimensions"]
-                image["aspectRatio"] = exif_data["aspectRatio"]
-                updates.append("dimensions")
-            
-            # Update date if we got EXIF date and don't have one
-            if exif_data["dateCreated"] != "Unknown" and not image.get("dateCreated"):
-                image["dateCreated"] = exif_data["dateCreated"]
-                updates.append("date")
+            jobs.append((i, image, image_path))
+        
+        started = time.time()
+        cache = self.open_cache(use_hash=use_hash) if use_cache else None
+        cached = [cache.get(EXIF_CACHE_KIND, image_path) if cache else None for _, _, image_path in jobs]
+        fresh = iter_exif_data(
+            [image_path for (_, _, image_path), data in zip(jobs, cached) if data is None],
+            workers=workers
+        )
+        
+        for (i, image, image_path), exif_data in zip(jobs, cached):
+            if exif_data is None:
+                exif_data = next(fresh)
+                if cache:
+                    cache.put(EXIF_CACHE_KIND, image_path, exif_data)
+            
+            print(f"{i:>3}. 🔍 {image_path.name[:40]:<42}", end="")
+            
+            updates = self._apply_exif_updates(image, exif_data)
             
             if updates:
                 print(f"✅ {', '.join(updates)}")
                 updated_count += 1
             else:
                 print("💭 No updates needed")
+        fresh.close()
         
         print("="*80)
+        print(f"⏱️  Processed {len(jobs)} files in {time.time() - started:.3f}s")
+        if cache:
+            print(f"🗃️  EXIF cache: {cache.hits} hits, {cache.misses} misses")
+            cache.close()
         
         if updated_count > 0:
             print(f"✅ Updated EXIF metadata for {updated_count}/{total_photos} photos")
             
+            # Back up the gallery before writing anything
+            backup_path = self.create_backup()
+            if not backup_path:
+                print("❌ Failed to create backup. Aborting EXIF extraction.")
+                self.metadata = self.load_metadata()
+                return
+            
             # Save the updated metadata
             self.save_metadata()
-            print("✅ Metadata saved successfully")
             
             # Auto-sync with photography.html
             print("🔄 Auto-syncing with photography.html...")
@@ -925,6 +1461,47 @@ class PhotoManager:
         else:
             print("✅ All photos already have complete EXIF metadata")
     
+    def benchmark_exif(self, repeat: int = 3):
+        """Compare the header-only EXIF reader against the Pillow path on the gallery."""
+        image_paths = sorted(
+            f for f in self.images_dir.iterdir()
+            if f.is_file() and f.suffix.lower() in ['.jpg', '.jpeg', '.png', '.webp']
+        ) if self.images_dir.exists() else []
+        
+        if not image_paths:
+            print("❌ No images found to benchmark")
+            return
+        
+        print(f"\n⏱️  EXIF benchmark: {len(image_paths)} files, best of {repeat} runs")
+        print("="*80)
+        
+        timings = {}
+        results = {}
+        for label, extractor in [("pillow", extract_exif_data_pillow), ("header", extract_exif_data)]:
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                results[label] = [extractor(image_path) for image_path in image_paths]
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            timings[label] = best
+            per_file = best / len(image_paths) * 1000
+            print(f"{label:<8} {best:>8.3f}s total  {per_file:>8.3f} ms/file")
+        
+        print("="*80)
+        speedup = timings["pillow"] / timings["header"] if timings["header"] else float("inf")
+        print(f"Header reader speedup: {speedup:.1f}x")
+        
+        mismatches = [
+            image_path.name for image_path, pillow_data, header_data
+            in zip(image_paths, results["pillow"], results["header"])
+            if pillow_data != header_data
+        ]
+        if mismatches:
+            print(f"⚠️  {len(mismatches)} files differ between readers: {', '.join(mismatches[:5])}")
+        else:
+            print("✅ Both readers produced identical metadata for every file")
+    
     def add_new_photo(self, photo_path: str):
         """Add a new photo to the gallery with EXIF extraction and interactive metadata collection.
         
@@ -951,7 +1528,12 @@ class PhotoManager:
         
         # Extract EXIF data first
         print("🔍 Extracting EXIF metadata...")
-        exif_data = self.extract_exif_data(source_path)
+        cache = self.open_cache()
+        exif_data = cache.get(EXIF_CACHE_KIND, source_path)
+        if exif_data is None:
+            exif_data = self.extract_exif_data(source_path)
+            cache.put(EXIF_CACHE_KIND, source_path, exif_data)
+        cache.close()
         
         # Display extracted information
         print("✅ EXIF Data Extracted:")
@@ -1015,6 +1597,11 @@ class PhotoManager:
         try:
             shutil.copy2(source_path, dest_path)
             print(f"✅ Copied {source_path.name} → {new_filename}")
+            
+            # Seed the cache so the next extract-exif run skips this file
+            cache = self.open_cache()
+            cache.put(EXIF_CACHE_KIND, dest_path, exif_data)
+            cache.close()
         except Exception as e:
             print(f"❌ Error copying file: {e}")
             return
@@ -1040,6 +1627,11 @@ class PhotoManager:
             "dateCreated": exif_data["dateCreated"] or datetime.now().strftime("%Y-%m-%d")
         }
         
+        try:
+            new_photo["placeholder"] = generate_placeholder(dest_path)
+        except Exception as e:
+            print(f"⚠️  Could not generate placeholder: {e}")
+        
         # Add to metadata
         self.metadata["images"].append(new_photo)
         self.save_metadata()
@@ -1050,6 +1642,164 @@ class PhotoManager:
         print("🔄 Auto-syncing with photography.html...")
         self.update_photography_html_fallback()
     
+    def available_derivative_formats(self) -> List[str]:
+        """Derivative formats the installed Pillow can encode."""
+        Image.init()
+        return [fmt for fmt, spec in DERIVATIVE_FORMATS.items() if spec["format"] in Image.SAVE]
+    
+    def generate_derivatives(self, widths: List[int] = None, formats: List[str] = None,
+                             workers: Optional[int] = None, force: bool = False):
+        """Generate responsive WebP/JPEG derivatives and record them as srcset tables.
+        
+        Each photo gets `srcset` (format -> list of {width, src}) and
+        `derivedFrom` (source fingerprint plus the settings used) in
+        metadata.json. Photos whose source file and settings are unchanged
+        are skipped, and derivative files no longer referenced are removed.
+        """
+        widths = sorted(widths or DERIVATIVE_WIDTHS)
+        formats = formats or ["webp", "jpeg"]
+        
+        available = self.available_derivative_formats()
+        unsupported = [fmt for fmt in formats if fmt not in available]
+        if unsupported:
+            print(f"⚠️  Pillow cannot encode {', '.join(unsupported)} here, skipping")
+            formats = [fmt for fmt in formats if fmt in available]
+        if not formats:
+            print("❌ No usable derivative formats")
+            return
+        
+        self.derived_dir.mkdir(parents=True, exist_ok=True)
+        
+        print(f"\n🖼️  Generating derivatives: widths {widths}, formats {formats}")
+        print("="*80)
+        
+        jobs = []
+        skipped = 0
+        for image in self.metadata.get("images", []):
+            image_path = self.images_dir / image.get("filename", "")
+            if not image.get("filename") or not image_path.exists():
+                print(f"  ❌ File missing: {image.get('filename')}")
+                continue
+            
+            stat = image_path.stat()
+            derived_from = {
+                "fingerprint": f"{stat.st_size}-{stat.st_mtime_ns}",
+                "widths": widths,
+                "formats": formats
+            }
+            
+            existing = image.get("srcset", {})
+            files_present = all(
+                (self.gallery_dir.parent / entry["src"]).exists()
+                for entries in existing.values() for entry in entries
+            )
+            if not force and image.get("derivedFrom") == derived_from and files_present:
+                skipped += 1
+                continue
+            
+            jobs.append((image, derived_from, (str(image_path), str(self.derived_dir), widths, formats)))
+        
+        started = time.time()
+        generated = 0
+        if jobs:
+            workers = min(workers or os.cpu_count() or 1, len(jobs))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for (image, derived_from, _), result in zip(jobs, executor.map(_derive_worker, [job for _, _, job in jobs])):
+                    if "error" in result:
+                        print(f"  ❌ {image['filename']}: {result['error']}")
+                        continue
+                    
+                    image["srcset"] = {
+                        fmt: [
+                            {"width": entry["width"], "src": f"{self.derived_dir.as_posix()}/{entry['file']}"}
+                            for entry in entries
+                        ]
+                        for fmt, entries in result["srcset"].items()
+                    }
+                    image["derivedFrom"] = derived_from
+                    generated += 1
+                    sizes = ", ".join(str(entry["width"]) for entry in next(iter(result["srcset"].values()), []))
+                    print(f"  ✅ {image['filename'][:40]:<42} {sizes or 'source too small'}")
+        
+        # Remove derivatives that no photo references any more
+        referenced = {
+            Path(entry["src"]).name
+            for image in self.metadata.get("images", [])
+            for entries in image.get("srcset", {}).values() for entry in entries
+        }
+        removed = 0
+        for derived_file in self.derived_dir.iterdir():
+            if derived_file.is_file() and derived_file.name not in referenced:
+                derived_file.unlink()
+                removed += 1
+        
+        print("="*80)
+        print(f"✅ {generated} regenerated, {skipped} unchanged, {removed} stale files removed in {time.time() - started:.2f}s")
+        
+        if generated > 0:
+            self.save_metadata()
+            print("🔄 Auto-syncing with photography.html...")
+            self.update_photography_html_fallback()
+    
+    def generate_placeholders(self, workers: Optional[int] = None, use_hash: bool = False, force: bool = False):
+        """Compute LQIP placeholders for every photo and store them in metadata.json.
+        
+        Results are cached by file fingerprint in the sidecar cache, and misses
+        are computed in one batched pass over a process pool.
+        """
+        images = [
+            image for image in self.metadata.get("images", [])
+            if image.get("filename") and (self.images_dir / image["filename"]).exists()
+        ]
+        if not images:
+            print("❌ No photos found to process")
+            return
+        
+        print(f"\n🌫️  Generating {PLACEHOLDER_SIZE}px placeholders for {len(images)} photos...")
+        started = time.time()
+        
+        cache = self.open_cache(use_hash=use_hash)
+        paths = [self.images_dir / image["filename"] for image in images]
+        cached = [None if force else cache.get(PLACEHOLDER_CACHE_KIND, path) for path in paths]
+        
+        misses = [path for path, data in zip(paths, cached) if data is None]
+        computed = iter([])
+        executor = None
+        if misses:
+            workers = min(workers or os.cpu_count() or 1, len(misses))
+            executor = ProcessPoolExecutor(max_workers=workers)
+            chunksize = max(1, len(misses) // (workers * 8))
+            computed = executor.map(_placeholder_worker, [str(path) for path in misses], chunksize=chunksize)
+        
+        updated_count = 0
+        try:
+            for image, path, data in zip(images, paths, cached):
+                if data is None:
+                    data = next(computed)
+                    if "error" in data:
+                        print(f"  ❌ {image['filename']}: {data['error']}")
+                        continue
+                    cache.put(PLACEHOLDER_CACHE_KIND, path, data)
+                
+                if image.get("placeholder") != data["placeholder"]:
+                    image["placeholder"] = data["placeholder"]
+                    updated_count += 1
+        finally:
+            if executor:
+                executor.shutdown()
+            hits = cache.hits
+            cache.close()
+        
+        print(f"⏱️  Done in {time.time() - started:.3f}s ({hits} cached, {len(misses)} computed)")
+        
+        if updated_count > 0:
+            print(f"✅ Updated placeholders for {updated_count}/{len(images)} photos")
+            self.save_metadata()
+            print("🔄 Auto-syncing with photography.html...")
+            self.update_photography_html_fallback()
+        else:
+            print("✅ All placeholders are up to date")
+    
     def update_photography_html_fallback(self):
         """Update photography.html fallback with current photo metadata for automatic loading."""
         photography_file = Path("photography.html")
@@ -1093,7 +1843,9 @@ class PhotoManager:
             fallback_data += f"                    sortOrder: {img.get('sortOrder', 0)},\n"
             fallback_data += f"                    aspectRatio: {img.get('aspectRatio', 1.5)},\n"
             dimensions = img.get('dimensions', {'width': 1920, 'height': 1280})
-            fallback_data += f"                    dimensions: {{ width: {dimensions.get('width', 1920)}, height: {dimensions.get('height', 1280)} }}\n"
+            fallback_data += f"                    dimensions: {{ width: {dimensions.get('width', 1920)}, height: {dimensions.get('height', 1280)} }},\n"
+            fallback_data += f"                    srcset: {json.dumps(img['srcset']) if img.get('srcset') else 'null'},\n"
+            fallback_data += f"                    placeholder: {json.dumps(img['placeholder']) if img.get('placeholder') else 'null'}\n"
             fallback_data += f"                }},\n"
         fallback_data += "            ];"
         
@@ -1120,7 +1872,9 @@ class PhotoManager:
                 featured: item.featured,
                 sortOrder: item.sortOrder,
                 aspectRatio: item.aspectRatio,
-                dimensions: item.dimensions
+                dimensions: item.dimensions,
+                srcset: item.srcset || null,
+                placeholder: item.placeholder || null
             }));"""
         
         # Replace the fallback mapping
@@ -1312,13 +2066,24 @@ def main():
     parser.add_argument("command", choices=[
         "list", "validate", "edit", "preview", "rename", 
         "fix", "bulk-titles", "bulk-captions", "add", "remove",
-        "validate-web", "fix-web", "update-fallback", "extract-exif"
+        "validate-web", "fix-web", "update-fallback", "extract-exif",
+        "benchmark-exif", "derive", "placeholders", "rollback", "prune", "recover"
     ], help="Command to execute")
     parser.add_argument("--photo", type=int, help="Photo ID for edit command")
     parser.add_argument("--category", help="Filter by category for list command")
     parser.add_argument("--featured", action="store_true", help="Show only featured photos")
     parser.add_argument("--preview", action="store_true", help="Preview mode for rename")
+    parser.add_argument("--workers", type=int, help="Worker processes for extract-exif (default: CPU count)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per reader for benchmark-exif")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the sidecar EXIF cache for extract-exif")
+    parser.add_argument("--hash", action="store_true", help="Also match cached files by content hash")
+    parser.add_argument("--backup", help="Backup directory for rollback command")
+    parser.add_argument("--abort", action="store_true", help="Undo an interrupted rename instead of finishing it")
+    parser.add_argument("--widths", help="Comma-separated derivative widths for derive (default: 320,640,1280,2048)")
+    parser.add_argument("--formats", help="Comma-separated derivative formats for derive: webp, jpeg, avif")
+    parser.add_argument("--force", action="store_true", help="Regenerate derivatives or placeholders even if sources are unchanged")
     parser.add_argument("path", nargs="?", help="Path to photo file for add command")
+    add_retention_arguments(parser)
     
     args = parser.parse_args()
     
@@ -1388,7 +2153,31 @@ def main():
     
     elif args.command == "extract-exif":
         """Extract EXIF metadata for all existing photos"""
-        manager.bulk_extract_exif()
+        manager.bulk_extract_exif(workers=args.workers, use_cache=not args.no_cache, use_hash=args.hash)
+    
+    elif args.command == "benchmark-exif":
+        manager.benchmark_exif(repeat=args.repeat)
+    
+    elif args.command == "derive":
+        widths = [int(w) for w in args.widths.split(",")] if args.widths else None
+        formats = [f.strip().lower() for f in args.formats.split(",")] if args.formats else None
+        manager.generate_derivatives(widths=widths, formats=formats, workers=args.workers, force=args.force)
+    
+    elif args.command == "placeholders":
+        manager.generate_placeholders(workers=args.workers, use_hash=args.hash, force=args.force)
+    
+    elif args.command == "rollback":
+        if not args.backup or not Path(args.backup).is_dir():
+            print("❌ Please provide an existing backup directory")
+            print("Usage: python photo_manager.py rollback --backup .backups/gallery_backup_YYYYMMDD_HHMMSS")
+        else:
+            manager._rollback_from_backup(Path(args.backup))
+    
+    elif args.command == "prune":
+        prune_backups(manager.backup_dir, **retention_options(args))
+    
+    elif args.command == "recover":
+        manager.recover_rename(abort=args.abort)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -8,21 +8,69 @@ Usage:
     python project_manager.py add <github_url>     # Add new project
     python project_manager.py list                 # Show all projects
     python project_manager.py update               # Fetch latest GitHub data
+    python project_manager.py update --graphql     # Fetch in batched GraphQL queries (needs GITHUB_TOKEN)
+    python project_manager.py refresh              # Revalidate only stale entries, leave expired ones to update
     python project_manager.py generate             # Generate HTML for projects page
     python project_manager.py remove <project>     # Remove project
     python project_manager.py validate             # Validate configuration
+    python project_manager.py prune --dry-run      # Show which old backups would be deleted
+    python project_manager.py bench-readmes [dir]  # Time README summaries over a corpus (default: README store)
+    python project_manager.py update --record DIR  # Save raw GitHub responses as fixtures
+    python project_manager.py update --replay DIR  # Serve responses from fixtures, no network
 """
 
 import os
 import sys
-import json
 import time
 import re
+import threading
+import hashlib
+import gzip
 import requests
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from backup_retention import parse_retention_options, prune_backups
+from state_io import batch_writes, load_json, save_json
+from http_utils import create_session, mount_fixtures, pop_fixture_options, retry_after_seconds, RateLimiter
+from cache_policy import CachePolicy, FRESH, STALE
+from readme_summary import benchmark, summarize_readme
+
+# Media type that makes the contents/readme endpoints return the file itself instead of base64 JSON
+GITHUB_RAW_MEDIA_TYPE = "application/vnd.github.raw"
+# Marker stored as the README "filename" when it was resolved through the /readme endpoint
+README_ENDPOINT = "/readme"
+# /readme answers that justify probing README filenames: not found, or raw media type not accepted
+README_FALLBACK_STATUSES = {404, 406, 415}
+# Seconds to hold back all workers after a rate limited README request that gave no reset time
+README_RATE_LIMIT_PAUSE = 60
+
+# Loops over projects write the cache once at the end, plus a checkpoint every N saves
+CACHE_CHECKPOINT_EVERY = 25
+
+# README candidates read through git object expressions in GraphQL batch mode (alias -> path)
+GRAPHQL_README_FILES = {
+    "readmeMd": "README.md",
+    "readmeLowerMd": "readme.md",
+    "readmeTxt": "README.txt",
+    "readmeLowerTxt": "readme.txt",
+    "readmePlain": "README",
+}
+GRAPHQL_PROJECT_FRAGMENT = """fragment ProjectFields on Repository {
+  name nameWithOwner description url sshUrl homepageUrl
+  stargazerCount forkCount diskUsage createdAt updatedAt pushedAt
+  primaryLanguage { name }
+  licenseInfo { name }
+  defaultBranchRef { name }
+  issues(states: OPEN) { totalCount }
+  pullRequests(states: OPEN) { totalCount }
+  repositoryTopics(first: 20) { nodes { topic { name } } }
+""" + "".join(
+    f'  {alias}: object(expression: "HEAD:{path}") {{ ... on Blob {{ text }} }}\n'
+    for alias, path in GRAPHQL_README_FILES.items()
+) + "}"
 
 class ProjectManager:
     def __init__(self):
@@ -32,13 +80,27 @@ class ProjectManager:
         self.backup_dir = Path(".backups")
         self.backup_dir.mkdir(exist_ok=True)
         
-        # GitHub API settings
-        self.github_api_base = "https://api.github.com/repos"
-        self.rate_limit_delay = 1.2  # Seconds between API calls
-        
         # Load configuration
         self.config = self.load_config()
+        settings = self.config.get('settings', {})
+        
+        # README bodies live in a content-addressed store next to the cache
+        self.readme_store = Path(settings.get('readme_store', '.projects_readmes'))
+        self.compress_readmes = settings.get('compress_readmes', True)
         self.cache = self.load_cache()
+        
+        # GitHub API settings (point github_api_url at a local stand-in server for testing)
+        self.cache_policy = CachePolicy.from_settings(settings)
+        self.github_api_base = settings.get('github_api_url', "https://api.github.com/repos").rstrip('/')
+        self.max_workers = settings.get('max_workers', 8)
+        headers = {"Accept": "application/vnd.github+json"}
+        token = os.environ.get(settings.get('github_token_env', 'GITHUB_TOKEN'))
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        self.session = create_session(pool_size=self.max_workers, headers=headers)
+        self.rate_limiter = RateLimiter(rate=settings.get('requests_per_second', 10), burst=self.max_workers)
+        self.fetch_stats = {"requests": 0, "not_modified": 0}
+        self.stats_lock = threading.Lock()
     
     def load_config(self) -> Dict:
         """Load projects configuration."""
@@ -47,8 +109,7 @@ class ProjectManager:
             return self.create_default_config()
         
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_json(self.config_file)
         except Exception as e:
             print(f"Error loading configuration: {e}")
             return self.create_default_config()
@@ -60,7 +121,17 @@ class ProjectManager:
             "settings": {
                 "auto_update": True,
                 "cache_duration": 86400,
+                "cache_max_age": 2592000,
                 "github_api_url": "https://api.github.com/repos",
+                "github_token_env": "GITHUB_TOKEN",
+                "max_workers": 8,
+                "requests_per_second": 10,
+                "readme_negative_ttl": 604800,
+                "readme_store": ".projects_readmes",
+                "compress_readmes": True,
+                "backend": "rest",
+                "github_graphql_url": "https://api.github.com/graphql",
+                "graphql_batch_size": 25,
                 "cache_file": ".projects_cache.json"
             },
             "metadata": {
@@ -78,8 +149,7 @@ class ProjectManager:
             config = self.config
         
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            save_json(self.config_file, config)
         except Exception as e:
             print(f"Error saving configuration: {e}")
     
@@ -89,29 +159,82 @@ class ProjectManager:
             return {}
         
         try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                cache = json.load(f)
-                
-            # Check cache expiration
-            cache_duration = self.config.get('settings', {}).get('cache_duration', 86400)
-            current_time = time.time()
-            
-            # Remove expired entries
-            for repo_url in list(cache.keys()):
-                if 'cached_at' in cache[repo_url]:
-                    if current_time - cache[repo_url]['cached_at'] > cache_duration:
-                        del cache[repo_url]
-            
-            return cache
+            # Expired entries are kept: they are served while being revalidated,
+            # and their ETags make the revalidation free
+            cache = load_json(self.cache_file)
         except Exception as e:
             print(f"Error loading cache: {e}")
             return {}
+        
+        # Move README bodies from older caches into the content store
+        migrated = 0
+        for entry in cache.values():
+            if 'readme_content' in entry:
+                content = entry.pop('readme_content')
+                entry['readme_sha256'] = self.store_readme(content) if content else None
+                migrated += 1
+        if migrated:
+            save_json(self.cache_file, cache, compact=True)
+            print(f"📦 Moved {migrated} README bodies into {self.readme_store}")
+        
+        return cache
+    
+    def _readme_path(self, digest: str, compressed: bool) -> Path:
+        return self.readme_store / digest[:2] / f"{digest}{'.md.gz' if compressed else '.md'}"
+    
+    def store_readme(self, content: str) -> str:
+        """Write a README body to the content store and return its SHA-256 key."""
+        data = content.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._readme_path(digest, self.compress_readmes)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            temp_path.write_bytes(gzip.compress(data, mtime=0) if self.compress_readmes else data)
+            os.replace(temp_path, path)
+        return digest
+    
+    def load_readme(self, entry: Optional[Dict]) -> Optional[str]:
+        """Read the README body a cache entry points to, or None if it is not stored."""
+        digest = (entry or {}).get('readme_sha256')
+        if not digest:
+            return None
+        for compressed in (True, False):
+            path = self._readme_path(digest, compressed)
+            if path.exists():
+                data = path.read_bytes()
+                return (gzip.decompress(data) if compressed else data).decode('utf-8')
+        return None
+    
+    def gc_readmes(self) -> int:
+        """Delete stored READMEs that no cache entry references any more."""
+        if not self.readme_store.exists():
+            return 0
+        referenced = {entry.get('readme_sha256') for entry in self.cache.values()}
+        removed = 0
+        for path in self.readme_store.glob("*/*.md*"):
+            if path.name.split('.')[0] not in referenced:
+                path.unlink()
+                removed += 1
+        return removed
+    
+    def cache_state(self, repo_url: str) -> Optional[str]:
+        """Freshness of a cached project: FRESH, STALE, EXPIRED or None if missing."""
+        return self.cache_policy.state(self.cache.get(repo_url))
+    
+    def use_fixtures(self, record_dir: Optional[Path] = None, replay_dir: Optional[Path] = None):
+        """Record GitHub responses to a directory, or replay them from it without the network."""
+        mount_fixtures(self.session, record_dir=record_dir, replay_dir=replay_dir)
+        if replay_dir:
+            print(f"📼 Replaying GitHub responses from {replay_dir}")
+            self.rate_limiter = RateLimiter(rate=None)
+        elif record_dir:
+            print(f"📼 Recording GitHub responses to {record_dir}")
     
     def save_cache(self):
         """Save cache to file."""
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, indent=2, ensure_ascii=False)
+            save_json(self.cache_file, self.cache, compact=True)
         except Exception as e:
             print(f"Error saving cache: {e}")
     
@@ -133,99 +256,108 @@ class ProjectManager:
         
         return None
     
-    def fetch_readme_content(self, owner: str, repo: str, default_branch: str = 'main') -> Optional[str]:
-        """Fetch README content from GitHub repository."""
+    def conditional_get(self, url: str, validators: Optional[Dict] = None, accept: Optional[str] = None):
+        """GET a URL, revalidating with ETag/Last-Modified when we have them.
+        
+        A 304 Not Modified answer costs no GitHub quota and no body download.
+        """
+        headers = {'Accept': accept} if accept else {}
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+        
+        response = self.rate_limiter.request(self.session, "GET", url, headers=headers, timeout=10)
+        with self.stats_lock:
+            self.fetch_stats["requests"] += 1
+            if response.status_code == 304:
+                self.fetch_stats["not_modified"] += 1
+        return response
+    
+    @staticmethod
+    def response_validators(response) -> Dict:
+        """Extract the cache validators GitHub sent with a response."""
+        return {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        }
+    
+    def fetch_readme_content(self, owner: str, repo: str, default_branch: str = 'main',
+                             cached: Optional[Dict] = None) -> Tuple[Optional[str], Optional[Dict]]:
+        """Fetch README content from GitHub repository.
+        
+        Uses the repository README endpoint with the raw media type, so GitHub
+        picks the file and no base64 decoding is needed: one request per repo,
+        or a free 304 when the cached copy is still current. Repos without a
+        README are remembered for readme_negative_ttl seconds. The filename
+        probe is only used when the endpoint answers 404 or rejects the raw
+        media type; rate limits and other errors keep the cached copy rather
+        than spending more requests.
+        
+        Returns the content plus the validators to cache alongside it.
+        """
+        cached_validators = (cached or {}).get('validators', {}).get('readme') or {}
+        cached_content = self.load_readme(cached)
+        negative_ttl = self.config.get('settings', {}).get('readme_negative_ttl', 604800)
+        if cached_validators.get('missing') and time.time() - cached_validators.get('checked_at', 0) < negative_ttl:
+            return None, cached_validators
+        
+        readme_url = f"{self.github_api_base}/{owner}/{repo}/readme"
+        try:
+            # Only revalidate when the stored body is there to fall back on
+            revalidate = cached_validators if cached_content is not None and cached_validators.get('filename') == README_ENDPOINT else None
+            response = self.conditional_get(readme_url, revalidate, accept=GITHUB_RAW_MEDIA_TYPE)
+            if response.status_code == 304:
+                return cached_content, cached_validators
+            if response.status_code == 200:
+                print(f"  ✅ Found README for {owner}/{repo}")
+                content = response.content.decode('utf-8', errors='replace')
+                return content, dict(self.response_validators(response), filename=README_ENDPOINT)
+            if response.status_code in README_FALLBACK_STATUSES:
+                return self.probe_readme_files(owner, repo, cached)
+            if self.rate_limiter.is_rate_limited(response) and response.headers.get('X-RateLimit-Reset') is None:
+                # The limiter has already honored any Retry-After; without one, hold every worker back
+                self.rate_limiter.pause(retry_after_seconds(response.headers) or README_RATE_LIMIT_PAUSE)
+            print(f"  ⚠️  README request for {owner}/{repo} failed ({response.status_code}), keeping cached copy")
+        except requests.exceptions.RequestException as e:
+            print(f"  ⚠️  README request for {owner}/{repo} failed ({e}), keeping cached copy")
+        
+        return cached_content, cached_validators or None
+    
+    def probe_readme_files(self, owner: str, repo: str, cached: Optional[Dict] = None) -> Tuple[Optional[str], Optional[Dict]]:
+        """Fallback: look for README files by name through the contents API."""
         # Try common README filenames
         readme_filenames = ['README.md', 'readme.md', 'README.txt', 'readme.txt', 'README']
+        cached_validators = (cached or {}).get('validators', {}).get('readme')
+        cached_content = self.load_readme(cached)
+        if cached_content is None:
+            cached_validators = None
+        if cached_validators and cached_validators.get('filename') in readme_filenames:
+            readme_filenames.remove(cached_validators['filename'])
+            readme_filenames.insert(0, cached_validators['filename'])
         
         for filename in readme_filenames:
             try:
                 readme_url = f"{self.github_api_base}/{owner}/{repo}/contents/{filename}"
-                
-                # Add delay to respect rate limits
-                time.sleep(self.rate_limit_delay)
-                
-                response = requests.get(readme_url, timeout=10)
+                revalidate = cached_validators if cached_validators and cached_validators.get('filename') == filename else None
+                response = self.conditional_get(readme_url, revalidate, accept=GITHUB_RAW_MEDIA_TYPE)
+                if response.status_code == 304:
+                    return cached_content, cached_validators
                 if response.status_code == 200:
-                    readme_data = response.json()
-                    
-                    # GitHub API returns base64 encoded content
-                    import base64
-                    content = base64.b64decode(readme_data['content']).decode('utf-8')
-                    print(f"  ✅ Found README: {filename}")
-                    return content
+                    content = response.content.decode('utf-8', errors='replace')
+                    print(f"  ✅ Found README for {owner}/{repo}: {filename}")
+                    return content, dict(self.response_validators(response), filename=filename)
                     
             except Exception as e:
                 continue  # Try next filename
         
-        print(f"  ⚠️  No README found")
-        return None
+        print(f"  ⚠️  No README found for {owner}/{repo}")
+        return None, {'missing': True, 'checked_at': time.time()}
     
     def parse_readme_description(self, readme_content: str) -> str:
         """Extract meaningful description from README content."""
-        if not readme_content:
-            return "No description available"
-        
-        lines = readme_content.split('\n')
-        description_parts = []
-        
-        # Look for the first meaningful paragraph after the title
-        title_found = False
-        in_code_block = False
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Skip empty lines
-            if not line:
-                continue
-            
-            # Track code blocks
-            if line.startswith('```'):
-                in_code_block = not in_code_block
-                continue
-            
-            # Skip lines inside code blocks
-            if in_code_block:
-                continue
-            
-            # Skip markdown headers for title detection
-            if line.startswith('#'):
-                title_found = True
-                continue
-            
-            # Skip badges, images, and links at the start
-            if line.startswith('!') or line.startswith('[!') or line.startswith('[!['):
-                continue
-            
-            # If we found a title and this is descriptive text
-            if title_found and len(line) > 20 and not line.startswith('##'):
-                # Clean up markdown formatting
-                clean_line = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', line)  # Remove links
-                clean_line = re.sub(r'\*\*([^\*]+)\*\*', r'\1', clean_line)  # Remove bold
-                clean_line = re.sub(r'\*([^\*]+)\*', r'\1', clean_line)  # Remove italic
-                clean_line = re.sub(r'`([^`]+)`', r'\1', clean_line)  # Remove code formatting
-                
-                description_parts.append(clean_line)
-                
-                # Stop after we have a good description (1-3 sentences)
-                if len(' '.join(description_parts)) > 100:
-                    break
-        
-        if description_parts:
-            description = ' '.join(description_parts)
-            # Limit to reasonable length
-            if len(description) > 200:
-                description = description[:197] + "..."
-            return description
-        
-        # Fallback: return first substantial line
-        for line in lines:
-            line = line.strip()
-            if len(line) > 20 and not line.startswith('#') and not line.startswith('!'):
-                return line[:200] + ("..." if len(line) > 200 else "")
-        
-        return "No description available"
+        return summarize_readme(readme_content)
 
     def fetch_github_data(self, repo_url: str) -> Optional[Dict]:
         """Fetch repository data from GitHub API. Uses GitHub description as primary source."""
@@ -239,17 +371,37 @@ class ProjectManager:
         
         print(f"Fetching data for {owner}/{repo}...")
         
+        cached = self.cache.get(repo_url)
+        
         try:
-            # Add delay to respect rate limits
-            time.sleep(self.rate_limit_delay)
+            repo_validators = ((cached or {}).get('validators') or {}).get('repo')
+            response = self.conditional_get(api_url, repo_validators)
+            if response.status_code == 304 and not repo_validators:
+                # A 304 we never asked for (a proxy, a mismatched fixture): get the full response instead
+                response = self.conditional_get(api_url)
+            if response.status_code == 304 and repo_validators:
+                # Nothing changed on GitHub: only the README needs checking
+                readme_content, readme_validators = self.fetch_readme_content(
+                    owner, repo, cached.get('default_branch', 'main'), cached=cached)
+                project_data = dict(cached)
+                readme_sha256 = self.store_readme(readme_content) if readme_content else None
+                if readme_sha256 != cached.get('readme_sha256'):
+                    readme_description = self.parse_readme_description(readme_content) if readme_content else None
+                    project_data['readme_description'] = readme_description or cached.get('description')
+                    project_data['readme_sha256'] = readme_sha256
+                project_data['validators'] = {'repo': repo_validators, 'readme': readme_validators}
+                project_data['cached_at'] = time.time()
+                return project_data
             
-            response = requests.get(api_url, timeout=10)
             response.raise_for_status()
+            if response.status_code == 304:
+                raise requests.exceptions.HTTPError(f"304 Not Modified with nothing cached for {api_url}", response=response)
             
             data = response.json()
             
             # Fetch README content
-            readme_content = self.fetch_readme_content(owner, repo, data.get('default_branch', 'main'))
+            readme_content, readme_validators = self.fetch_readme_content(
+                owner, repo, data.get('default_branch', 'main'), cached=cached)
             readme_description = self.parse_readme_description(readme_content) if readme_content else None
             
             # Extract relevant information
@@ -274,7 +426,8 @@ class ProjectManager:
                 'html_url': data.get('html_url'),
                 'clone_url': data.get('clone_url'),
                 'ssh_url': data.get('ssh_url'),
-                'readme_content': readme_content,
+                'readme_sha256': self.store_readme(readme_content) if readme_content else None,
+                'validators': {'repo': self.response_validators(response), 'readme': readme_validators},
                 'cached_at': time.time()
             }
             
@@ -287,21 +440,143 @@ class ProjectManager:
             print(f"Unexpected error fetching data for {repo_url}: {e}")
             return None
     
+    def fetch_github_data_graphql(self, repo_urls: List[str]) -> Dict[str, Optional[Dict]]:
+        """Fetch many repositories through the GraphQL API, batch_size repos per query.
+        
+        Each repository becomes an aliased field in one query, and README text
+        is read in the same request via git object expressions. Returns
+        project_data dicts shaped like fetch_github_data's, keyed by URL
+        (None for repos that could not be fetched).
+        """
+        settings = self.config.get('settings', {})
+        graphql_url = settings.get('github_graphql_url', "https://api.github.com/graphql")
+        batch_size = settings.get('graphql_batch_size', 25)
+        results = {}
+        
+        parsed = []
+        for url in repo_urls:
+            owner_repo = self.parse_github_url(url)
+            if owner_repo:
+                parsed.append((url, owner_repo))
+            else:
+                print(f"Invalid GitHub URL: {url}")
+                results[url] = None
+        
+        for start in range(0, len(parsed), batch_size):
+            batch = parsed[start:start + batch_size]
+            variables = {}
+            fields = []
+            declarations = []
+            for i, (_, (owner, repo)) in enumerate(batch):
+                variables[f"owner{i}"], variables[f"name{i}"] = owner, repo
+                declarations.append(f"$owner{i}: String!, $name{i}: String!")
+                fields.append(f"r{i}: repository(owner: $owner{i}, name: $name{i}) {{ ...ProjectFields }}")
+            query = (f"query({', '.join(declarations)}) {{\n  {chr(10).join(fields)}\n"
+                     f"  rateLimit {{ cost remaining resetAt }}\n}}\n{GRAPHQL_PROJECT_FRAGMENT}")
+            
+            print(f"Fetching {len(batch)} repositories in one GraphQL query...")
+            try:
+                response = self.rate_limiter.request(self.session, "POST", graphql_url,
+                                                     json={"query": query, "variables": variables}, timeout=30)
+                response.raise_for_status()
+                payload = response.json()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f"❌ GraphQL request failed: {e}")
+                for url, _ in batch:
+                    results[url] = None
+                continue
+            
+            with self.stats_lock:
+                self.fetch_stats["requests"] += 1
+            for error in payload.get("errors", []):
+                print(f"  ⚠️  {error.get('message')}")
+            data = payload.get("data") or {}
+            rate_limit = data.get("rateLimit")
+            if rate_limit:
+                print(f"  Query cost {rate_limit['cost']}, {rate_limit['remaining']} points left")
+            
+            for i, (url, _) in enumerate(batch):
+                node = data.get(f"r{i}")
+                results[url] = self.project_data_from_graphql(node, cached=self.cache.get(url)) if node else None
+        
+        return results
+    
+    def project_data_from_graphql(self, node: Dict, cached: Optional[Dict] = None) -> Dict:
+        """Map a GraphQL repository node onto the REST-shaped project_data dict.
+        
+        GraphQL has no ETags, so the previous entry's REST validators are carried
+        over (README validators only while the README body is unchanged) and a
+        later REST run can still revalidate with conditional requests.
+        """
+        readme_content = None
+        for alias in GRAPHQL_README_FILES:
+            blob = node.get(alias)
+            if blob and blob.get("text") is not None:
+                readme_content = blob["text"]
+                break
+        readme_description = self.parse_readme_description(readme_content) if readme_content else None
+        readme_sha256 = self.store_readme(readme_content) if readme_content else None
+        
+        previous_validators = (cached or {}).get('validators') or {}
+        validators = {'repo': previous_validators.get('repo'), 'readme': None}
+        if cached and cached.get('readme_sha256') == readme_sha256:
+            validators['readme'] = previous_validators.get('readme')
+        
+        return {
+            'name': node.get('name'),
+            'full_name': node.get('nameWithOwner'),
+            'description': node.get('description') or 'No description available',
+            'readme_description': readme_description or node.get('description') or 'No description available',
+            'language': (node.get('primaryLanguage') or {}).get('name'),
+            'stars': node.get('stargazerCount', 0),
+            'forks': node.get('forkCount', 0),
+            # REST's watchers_count is the star count, not the subscriber count
+            'watchers': node.get('stargazerCount', 0),
+            # REST's open_issues_count includes open pull requests
+            'open_issues': (node.get('issues') or {}).get('totalCount', 0) + (node.get('pullRequests') or {}).get('totalCount', 0),
+            'topics': [item['topic']['name'] for item in (node.get('repositoryTopics') or {}).get('nodes', [])],
+            'homepage': node.get('homepageUrl') or None,
+            'license': (node.get('licenseInfo') or {}).get('name'),
+            'created_at': node.get('createdAt'),
+            'updated_at': node.get('updatedAt'),
+            'pushed_at': node.get('pushedAt'),
+            'size': node.get('diskUsage') or 0,
+            'default_branch': (node.get('defaultBranchRef') or {}).get('name', 'main'),
+            'html_url': node.get('url'),
+            'clone_url': f"{node.get('url')}.git",
+            'ssh_url': node.get('sshUrl'),
+            'readme_sha256': readme_sha256,
+            'validators': validators,
+            'cached_at': time.time()
+        }
+    
     def get_project_data(self, repo_url: str, force_update: bool = False) -> Optional[Dict]:
-        """Get project data from cache or fetch from GitHub."""
-        # Check cache first
-        if not force_update and repo_url in self.cache:
+        """Get project data from cache or fetch from GitHub.
+        
+        Every fetch is saved to the cache; loops over many projects run inside
+        batch_writes() so those saves are coalesced into checkpointed writes.
+        """
+        # Check cache first; stale entries are served as-is and revalidated by refresh/update
+        state = self.cache_state(repo_url)
+        if not force_update and state == FRESH:
             print(f"Using cached data for {repo_url}")
             return self.cache[repo_url]
+        if not force_update and state == STALE:
+            print(f"Using stale cached data for {repo_url} (run 'refresh' to revalidate)")
+            return self.cache[repo_url]
         
-        # Fetch fresh data
+        # Fetch fresh data (an expired entry is revalidated, and served if GitHub is unreachable)
         data = self.fetch_github_data(repo_url)
         if data:
             self.cache[repo_url] = data
             self.save_cache()
+        elif repo_url in self.cache:
+            print(f"⚠️  Using stale cached data for {repo_url}")
+            return self.cache[repo_url]
         
         return data
     
+    @batch_writes()
     def add_project(self, repo_url: str):
         """Add a new project to the configuration."""
         print(f"\nAdding project: {repo_url}")
@@ -347,6 +622,7 @@ class ProjectManager:
         """Get all project URLs from configuration."""
         return self.config.get('projects', [])
     
+    @batch_writes(checkpoint_every=CACHE_CHECKPOINT_EVERY)
     def list_projects(self):
         """List all projects with their information."""
         all_urls = self.get_all_project_urls()
@@ -378,8 +654,16 @@ class ProjectManager:
         print(f"Total projects: {len(all_urls)}")
         print(f"Last updated: {self.config['metadata'].get('last_updated', 'Never')}")
     
-    def update_projects(self, force: bool = False):
-        """Update all project data from GitHub."""
+    @batch_writes(checkpoint_every=CACHE_CHECKPOINT_EVERY)
+    def update_projects(self, force: bool = False, backend: Optional[str] = None, stale_only: bool = False):
+        """Update all project data from GitHub.
+        
+        The REST backend fetches repos concurrently; the graphql backend
+        (settings.backend or --graphql) fetches them in batched queries and
+        needs a GITHUB_TOKEN. With stale_only (the refresh command) only
+        STALE entries are revalidated: fresh ones are served from the cache,
+        and expired or missing ones are left for update.
+        """
         all_urls = self.get_all_project_urls()
         
         if not all_urls:
@@ -388,22 +672,64 @@ class ProjectManager:
         
         print(f"\nUpdating {len(all_urls)} projects...")
         updated_count = 0
+        started = time.time()
         
-        for i, url in enumerate(all_urls, 1):
-            print(f"[{i}/{len(all_urls)}] Updating {url}")
-            
-            project_data = self.get_project_data(url, force_update=force)
-            if project_data:
+        states = {url: self.cache_state(url) for url in all_urls}
+        if stale_only:
+            stale_urls = [url for url in all_urls if states[url] == STALE]
+        else:
+            stale_urls = [url for url in all_urls if force or states[url] != FRESH]
+        for url in all_urls:
+            if url in stale_urls:
+                continue
+            if states[url] == FRESH:
+                print(f"Using cached data for {url}")
                 updated_count += 1
             else:
-                print(f"  ❌ Failed to update")
+                print(f"Skipping {url} ({states[url] or 'not cached'}, run 'update' to fetch it)")
+        
+        backend = backend or self.config.get('settings', {}).get('backend', 'rest')
+        if backend == 'graphql' and 'Authorization' not in self.session.headers:
+            print("⚠️  The GraphQL API requires a token (set GITHUB_TOKEN), falling back to REST")
+            backend = 'rest'
+        
+        # Fetch concurrently or in batches; the cache is only touched from this thread
+        if stale_urls and backend == 'graphql':
+            fetched = self.fetch_github_data_graphql(stale_urls)
+            for i, url in enumerate(stale_urls, 1):
+                if fetched.get(url):
+                    self.cache[url] = fetched[url]
+                    self.save_cache()
+                    updated_count += 1
+                    print(f"[{i}/{len(stale_urls)}] ✅ Updated {url}")
+                else:
+                    print(f"[{i}/{len(stale_urls)}] ❌ Failed to update {url}")
+        elif stale_urls:
+            workers = min(self.max_workers, len(stale_urls))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for i, (url, project_data) in enumerate(zip(stale_urls, executor.map(self.fetch_github_data, stale_urls)), 1):
+                    if project_data:
+                        self.cache[url] = project_data
+                        self.save_cache()
+                        updated_count += 1
+                        print(f"[{i}/{len(stale_urls)}] ✅ Updated {url}")
+                    else:
+                        print(f"[{i}/{len(stale_urls)}] ❌ Failed to update {url}")
+        
+        removed = self.gc_readmes()
+        if removed:
+            print(f"🗑️  Removed {removed} unreferenced README bodies")
         
         # Update metadata
         self.config['metadata']['last_updated'] = datetime.now().isoformat()
         self.save_config()
         
-        print(f"\n✅ Updated {updated_count}/{len(all_urls)} projects successfully!")
+        print(f"\n✅ Updated {updated_count}/{len(all_urls)} projects successfully in {time.time() - started:.1f}s!")
+        if backend == 'rest' and self.fetch_stats["requests"]:
+            print(f"♻️  {self.fetch_stats['not_modified']}/{self.fetch_stats['requests']} requests answered "
+                  f"304 Not Modified (no download, no rate limit used)")
     
+    @batch_writes(checkpoint_every=CACHE_CHECKPOINT_EVERY)
     def generate_project_cards_html(self) -> str:
         """Generate HTML for project cards only (not the entire section)."""
         project_urls = self.config.get('projects', [])
@@ -633,12 +959,14 @@ class ProjectManager:
         print("="*60)
 
 def main():
+    fixture_options = pop_fixture_options(sys.argv)
     if len(sys.argv) < 2:
         print(__doc__)
         sys.exit(1)
     
     command = sys.argv[1].lower()
     project_manager = ProjectManager()
+    project_manager.use_fixtures(**fixture_options)
     
     if command == "add":
         if len(sys.argv) < 3:
@@ -653,7 +981,12 @@ def main():
         
     elif command == "update":
         force = "--force" in sys.argv
-        project_manager.update_projects(force)
+        backend = "graphql" if "--graphql" in sys.argv else None
+        project_manager.update_projects(force, backend=backend)
+        
+    elif command == "refresh":
+        backend = "graphql" if "--graphql" in sys.argv else None
+        project_manager.update_projects(backend=backend, stale_only=True)
         
     elif command == "generate":
         project_manager.generate_projects_page()
@@ -669,6 +1002,13 @@ def main():
     elif command == "validate":
         project_manager.validate_config()
         
+    elif command == "prune":
+        prune_backups(project_manager.backup_dir, **parse_retention_options(sys.argv[2:]))
+        
+    elif command == "bench-readmes":
+        corpus = [Path(arg) for arg in sys.argv[2:]] or [project_manager.readme_store]
+        benchmark(corpus)
+        
     else:
         print(f"Unknown command: {command}")
         print(__doc__)
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Publication Enrichment
+Bulk DOI, venue and open-access lookup for Scholar publications by title.
+
+Titles are looked up in batches through OpenAlex's works filter (many exact
+title phrases OR'ed into one request, split further whenever the matches
+overflow a results page), and titles OpenAlex misses are tried one at a
+time against Crossref's bibliographic search. A result is only accepted when its
+title matches the publication's closely (and its year, when both are known).
+Every lookup is cached on disk by normalized title, so a title is resolved
+once; misses are retried after a TTL. Both base URLs come from settings, so a
+local stand-in server or --replay fixtures can answer instead.
+
+Usage:
+    from publication_enrichment import PublicationEnricher
+    enricher = PublicationEnricher(session, rate_limiter, Path(".scholar_enrichment_cache.json"), settings)
+    misses = enricher.enrich(publications)    # fills doi/doi_url/canonical_venue/external_url in place
+"""
+
+import re
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from http_utils import RateLimitPaused
+from state_io import load_json, save_json
+
+DEFAULT_OPENALEX_URL = "https://api.openalex.org"
+DEFAULT_CROSSREF_URL = "https://api.crossref.org"
+OPENALEX_FIELDS = "doi,title,publication_year,primary_location,open_access"
+CROSSREF_FIELDS = "DOI,title,container-title,issued"
+# Largest page OpenAlex serves; a batch with more matches than this is split
+OPENALEX_PAGE_SIZE = 200
+
+# Minimum similarity between normalized titles for a search result to count as the same paper
+TITLE_MATCH_THRESHOLD = 0.93
+NON_ALPHANUMERIC = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase alphanumeric words, the form titles are matched and cached by."""
+    return NON_ALPHANUMERIC.sub(' ', (title or '').lower()).strip()
+
+
+def titles_match(title: str, candidate: str) -> bool:
+    a, b = normalize_title(title), normalize_title(candidate)
+    return bool(a and b) and (a == b or SequenceMatcher(None, a, b).ratio() >= TITLE_MATCH_THRESHOLD)
+
+
+def years_match(year: Optional[int], candidate: Optional[int]) -> bool:
+    return not year or not candidate or abs(year - candidate) <= 1
+
+
+class PublicationEnricher:
+    """Resolves DOIs, canonical venues and open-access links for publications in bulk."""
+
+    def __init__(self, session: requests.Session, rate_limiter, cache_file: Path, settings: Dict):
+        self.session = session
+        self.rate_limiter = rate_limiter
+        self.cache_file = Path(cache_file)
+        self.enabled = settings.get('enrichment', True)
+        self.openalex_url = settings.get('openalex_url', DEFAULT_OPENALEX_URL).rstrip('/')
+        self.crossref_url = settings.get('crossref_url', DEFAULT_CROSSREF_URL).rstrip('/')
+        self.mailto = settings.get('mailto')
+        self.batch_size = settings.get('enrichment_batch_size', 25)
+        self.miss_ttl = settings.get('enrichment_miss_ttl', 7 * 86400)
+        self.retries = settings.get('request_retries', 3)
+        self.cache = None
+
+    @staticmethod
+    def api_hosts(settings: Dict) -> List[str]:
+        """Hosts of the metadata APIs, for giving them their own rate limits."""
+        return [
+            urlparse(settings.get('openalex_url', DEFAULT_OPENALEX_URL)).netloc.lower(),
+            urlparse(settings.get('crossref_url', DEFAULT_CROSSREF_URL)).netloc.lower(),
+        ]
+
+    def load_cache(self) -> Dict:
+        if self.cache is None:
+            try:
+                self.cache = load_json(self.cache_file) if self.cache_file.exists() else {}
+            except Exception as e:
+                print(f"⚠️  Error loading enrichment cache: {e}")
+                self.cache = {}
+        return self.cache
+
+    def save_cache(self):
+        try:
+            save_json(self.cache_file, self.cache, compact=True)
+        except Exception as e:
+            print(f"⚠️  Error saving enrichment cache: {e}")
+
+    def get_json(self, url: str, params: Dict) -> Optional[Dict]:
+        """GET a JSON API response, or None on any failure (the title is then retried next run)."""
+        if self.mailto:
+            params = {**params, 'mailto': self.mailto}
+        try:
+            response = self.rate_limiter.request(self.session, "GET", url, params=params,
+                                                 retries=self.retries, timeout=15)
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, RateLimitPaused, ValueError) as e:
+            print(f"    ⚠️  Metadata lookup failed: {e}")
+            return None
+
+    def search_openalex(self, titles: List[str]) -> Optional[List[Dict]]:
+        """All OpenAlex works containing any of the titles as an exact phrase, usually in one request.
+
+        If more works match than fit on one page, the batch is halved and each
+        half searched again, so one title's many near-namesakes cannot push
+        another title's match off the page.
+        """
+        query = '|'.join(f'"{normalize_title(title)}"' for title in titles)
+        data = self.get_json(f"{self.openalex_url}/works", {
+            'filter': f"title.search:{query}",
+            'select': OPENALEX_FIELDS,
+            'per-page': OPENALEX_PAGE_SIZE,
+        })
+        if data is None:
+            return None
+
+        results = data.get('results', [])
+        total = (data.get('meta') or {}).get('count', len(results))
+        if total > len(results) and len(titles) > 1:
+            middle = len(titles) // 2
+            first, second = self.search_openalex(titles[:middle]), self.search_openalex(titles[middle:])
+            return None if first is None or second is None else first + second
+
+        works = []
+        for work in results:
+            location = work.get('primary_location') or {}
+            source = location.get('source') or {}
+            doi = (work.get('doi') or '').replace('https://doi.org/', '') or None
+            works.append({
+                'title': work.get('title') or '',
+                'year': work.get('publication_year'),
+                'doi': doi,
+                'venue': source.get('display_name'),
+                'oa_url': (work.get('open_access') or {}).get('oa_url'),
+                'source': 'openalex',
+            })
+        return works
+
+    def search_crossref(self, title: str) -> Optional[List[Dict]]:
+        """Crossref's best bibliographic matches for one title."""
+        data = self.get_json(f"{self.crossref_url}/works", {
+            'query.bibliographic': title,
+            'select': CROSSREF_FIELDS,
+            'rows': 3,
+        })
+        if data is None:
+            return None
+
+        works = []
+        for item in data.get('message', {}).get('items', []):
+            date_parts = (item.get('issued') or {}).get('date-parts') or [[None]]
+            works.append({
+                'title': (item.get('title') or [''])[0],
+                'year': date_parts[0][0] if date_parts[0] else None,
+                'doi': item.get('DOI'),
+                'venue': (item.get('container-title') or [None])[0],
+                'oa_url': None,
+                'source': 'crossref',
+            })
+        return works
+
+    @staticmethod
+    def best_match(pub: Dict, works: List[Dict]) -> Optional[Dict]:
+        for work in works:
+            if work.get('doi') and titles_match(pub.get('title', ''), work['title']) \
+                    and years_match(pub.get('year'), work.get('year')):
+                return work
+        return None
+
+    def cached_result(self, key: str) -> Optional[Dict]:
+        """A cached hit, a cached miss still within its TTL, or None if the title must be looked up."""
+        entry = self.load_cache().get(key)
+        if not entry:
+            return None
+        if entry.get('missing') and time.time() - entry.get('checked_at', 0) > self.miss_ttl:
+            return None
+        return entry
+
+    def remember(self, key: str, work: Optional[Dict]):
+        if work:
+            entry = {field: work.get(field) for field in ('doi', 'venue', 'oa_url', 'source')}
+        else:
+            entry = {'missing': True}
+        entry['checked_at'] = time.time()
+        self.load_cache()[key] = entry
+
+    @staticmethod
+    def apply(pub: Dict, entry: Dict):
+        pub['doi'] = entry['doi']
+        pub['doi_url'] = f"https://doi.org/{entry['doi']}"
+        if entry.get('venue'):
+            pub['canonical_venue'] = entry['venue']
+        if entry.get('oa_url') and not pub.get('external_url'):
+            pub['external_url'] = entry['oa_url']
+        pub['metadata_source'] = entry.get('source')
+        pub['links_checked'] = True
+
+    def enrich(self, publications: List[Dict]) -> List[Dict]:
+        """Fill in metadata for the publications in place and return the ones no source could resolve."""
+        if not self.enabled or not publications:
+            return list(publications)
+
+        lookup = {}
+        misses = []
+        for pub in publications:
+            key = normalize_title(pub.get('title', ''))
+            entry = self.cached_result(key) if key else {'missing': True}
+            if entry is None:
+                lookup.setdefault(key, []).append(pub)
+            elif entry.get('missing'):
+                misses.append(pub)
+            else:
+                self.apply(pub, entry)
+
+        if not lookup:
+            return misses
+
+        print(f"  📚 Looking up {len(lookup)} titles on OpenAlex ({self.batch_size} per request)...")
+        keys = list(lookup)
+        unresolved = []
+        for start in range(0, len(keys), self.batch_size):
+            batch = keys[start:start + self.batch_size]
+            works = self.search_openalex([lookup[key][0]['title'] for key in batch])
+            for key in batch:
+                work = self.best_match(lookup[key][0], works) if works else None
+                if work:
+                    self.remember(key, work)
+                else:
+                    unresolved.append((key, works is not None))
+
+        if unresolved:
+            print(f"  📚 Trying {len(unresolved)} titles on Crossref...")
+        for key, openalex_answered in unresolved:
+            works = self.search_crossref(lookup[key][0]['title'])
+            work = self.best_match(lookup[key][0], works) if works else None
+            if work or (openalex_answered and works is not None):
+                self.remember(key, work)
+
+        found = 0
+        for key, pubs in lookup.items():
+            entry = self.load_cache().get(key)
+            for pub in pubs:
+                if entry and not entry.get('missing'):
+                    self.apply(pub, entry)
+                    found += 1
+                else:
+                    misses.append(pub)
+        self.save_cache()
+        print(f"  📚 Resolved {found} publications from metadata APIs, {len(misses)} left for Scholar pages")
+        return misses
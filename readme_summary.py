@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+README Summary
+Single-pass extraction of a short project description from a README.
+
+The README is consumed line by line, either from a string (without splitting
+the whole text up front) or from an open text stream such as a gzip file from
+the README store, and reading stops as soon as enough clean prose has been
+collected. Code fences, HTML blocks and comments, tables, badge/image lines and
+link reference definitions are skipped; inline links, emphasis, code spans and
+HTML tags are stripped with one precompiled pattern per line.
+
+Usage:
+    from readme_summary import summarize_readme, benchmark
+    description = summarize_readme(readme_text)
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        description = summarize_readme(f)                 # stops reading early
+    benchmark([Path(".projects_readmes")])                # time it over a corpus
+"""
+
+import gzip
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+DESCRIPTION_LIMIT = 200
+# Stop at the end of a paragraph once at least this much prose has been collected
+DESCRIPTION_MIN = 100
+MIN_LINE_LENGTH = 20
+NO_DESCRIPTION = "No description available"
+
+FENCE = re.compile(r'^(`{3,}|~{3,})')
+ATX_HEADING = re.compile(r'^#{1,6}(?:\s|$)')
+SETEXT_UNDERLINE = re.compile(r'^(?:=+|-+)\s*$')
+HTML_HEADING = re.compile(r'^<h[1-6][\s>]', re.IGNORECASE)
+HTML_HEADING_END = re.compile(r'</h[1-6]>\s*$', re.IGNORECASE)
+HTML_BLOCK = re.compile(r'^</?[a-zA-Z][a-zA-Z0-9-]*(?:\s|/?>|$)')
+TABLE_ROW = re.compile(r'^\||^:?-{3,}:?\s*\|')
+LINK_DEFINITION = re.compile(r'^\[[^\]]+\]:')
+# Images and badges, optionally wrapped in a link: ![alt](src), [![alt](src)](href), [![alt]][ref]
+IMAGE = re.compile(r'\[?!\[[^\]]*\](?:\([^)]*\)|\[[^\]]*\])?(?:\]\([^)]*\)|\]\[[^\]]*\])?')
+# Inline markup whose text is kept: [text](href), [text][ref], [text], **bold**, __bold__, *italic*, _italic_, `code`
+INLINE_MARKUP = re.compile(
+    r'\[([^\]]+)\](?:\([^)]*\)|\[[^\]]*\])?'
+    r'|\*\*([^*]+)\*\*|__([^_]+)__'
+    r'|\*([^*]+)\*|\b_([^_]+)_\b'
+    r'|`([^`]+)`'
+)
+HTML_TAG = re.compile(r'<[^>]+>')
+WHITESPACE = re.compile(r'\s+')
+
+ReadmeSource = Union[str, TextIO, Iterable[str]]
+
+
+def _keep_text(match: re.Match) -> str:
+    return next(group for group in match.groups() if group is not None)
+
+
+def clean_inline(line: str) -> str:
+    """Strip images, inline markup and HTML tags from one line of prose."""
+    line = IMAGE.sub('', line)
+    line = INLINE_MARKUP.sub(_keep_text, line)
+    line = HTML_TAG.sub('', line)
+    return WHITESPACE.sub(' ', line).strip()
+
+
+def iter_lines(source: ReadmeSource) -> Iterator[str]:
+    """Yield lines from a string lazily, or from any iterable of lines (e.g. an open file)."""
+    if not isinstance(source, str):
+        yield from source
+        return
+    start = 0
+    length = len(source)
+    while start < length:
+        end = source.find('\n', start)
+        if end == -1:
+            end = length
+        yield source[start:end]
+        start = end + 1
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def summarize(source: ReadmeSource, limit: int = DESCRIPTION_LIMIT) -> Tuple[Optional[str], int]:
+    """Return (description or None, characters consumed) for a README."""
+    parts: List[str] = []
+    collected = 0
+    consumed = 0
+    fallback = None
+    title_found = False
+    fence = None            # opening fence of the code block we are in
+    in_html = False         # inside an HTML block, which ends at a blank line
+    in_comment = False      # inside <!-- ... -->
+    previous = None         # (text, index in parts or None) of the last prose line, for setext titles
+
+    for raw in iter_lines(source):
+        consumed += len(raw) + 1
+        line = raw.strip()
+
+        if in_comment:
+            in_comment = '-->' not in line
+            continue
+        if fence:
+            if line.startswith(fence):
+                fence = None
+            continue
+
+        if not line:
+            in_html = False
+            previous = None
+            if collected >= DESCRIPTION_MIN:
+                break
+            continue
+
+        match = FENCE.match(line)
+        if match:
+            fence = match.group(1)
+            previous = None
+            continue
+
+        if line.startswith('<!--'):
+            in_comment = '-->' not in line
+            continue
+        if in_html:
+            continue
+        if HTML_HEADING.match(line):
+            title_found = True
+            in_html = not HTML_HEADING_END.search(line)
+            continue
+        if HTML_BLOCK.match(line):
+            in_html = True
+            continue
+
+        if ATX_HEADING.match(line):
+            title_found = True
+            previous = None
+            continue
+
+        if SETEXT_UNDERLINE.match(line):
+            # "Title\n=====" makes the previous line a heading; on its own it is a rule
+            if previous is not None:
+                title_found = True
+                text, index = previous
+                if index is not None:
+                    collected -= len(parts.pop(index)) + 1
+                if fallback == text:
+                    fallback = None
+            previous = None
+            continue
+
+        if TABLE_ROW.match(line) or LINK_DEFINITION.match(line):
+            previous = None
+            continue
+
+        text = clean_inline(line.lstrip('>').strip())
+        if len(text) <= MIN_LINE_LENGTH:
+            previous = (text, None) if text else None
+            continue
+
+        if title_found:
+            parts.append(text)
+            collected += len(text) + 1
+            previous = (text, len(parts) - 1)
+            if collected >= limit:
+                break
+        else:
+            if fallback is None:
+                fallback = text
+            previous = (text, None)
+
+    if parts:
+        return _truncate(' '.join(parts), limit), consumed
+    if fallback:
+        return _truncate(fallback, limit), consumed
+    return None, consumed
+
+
+def summarize_readme(source: ReadmeSource, limit: int = DESCRIPTION_LIMIT) -> str:
+    """Extract a short description from README text or an open README stream."""
+    if not source:
+        return NO_DESCRIPTION
+    description, _ = summarize(source, limit)
+    return description or NO_DESCRIPTION
+
+
+def readme_corpus(paths: Iterable[Path]) -> List[Path]:
+    """Collect README files (.md, .txt, .rst, plain README and their .gz forms) from files and directories."""
+    suffixes = {'.md', '.markdown', '.txt', '.rst', ''}
+    corpus = []
+    for path in paths:
+        path = Path(path)
+        candidates = sorted(path.rglob('*')) if path.is_dir() else [path]
+        for candidate in candidates:
+            name = candidate.name[:-3] if candidate.name.endswith('.gz') else candidate.name
+            if candidate.is_file() and not name.startswith('.') and Path(name).suffix.lower() in suffixes:
+                corpus.append(candidate)
+    return corpus
+
+
+def _open_readme(path: Path) -> TextIO:
+    if path.name.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def benchmark(paths: Iterable[Path], repeat: int = 5) -> Dict:
+    """Time summarize_readme over a corpus of READMEs and report how much of each was read."""
+    corpus = readme_corpus(paths)
+    if not corpus:
+        print("❌ No READMEs found to benchmark")
+        return {}
+
+    texts = []
+    for path in corpus:
+        with _open_readme(path) as f:
+            texts.append(f.read())
+    total_chars = sum(len(text) for text in texts)
+
+    consumed = 0
+    in_memory = float('inf')
+    for _ in range(repeat):
+        consumed = 0
+        start = time.perf_counter()
+        for text in texts:
+            consumed += summarize(text)[1]
+        in_memory = min(in_memory, time.perf_counter() - start)
+
+    streamed = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in corpus:
+            with _open_readme(path) as f:
+                summarize(f)
+        streamed = min(streamed, time.perf_counter() - start)
+
+    stats = {
+        "files": len(corpus),
+        "total_chars": total_chars,
+        "consumed_chars": min(consumed, total_chars),
+        "in_memory_seconds": in_memory,
+        "streamed_seconds": streamed,
+    }
+    print(f"📊 {stats['files']} READMEs, {total_chars / 1024:.0f} KB total")
+    print(f"   Read {stats['consumed_chars'] / 1024:.0f} KB "
+          f"({100 * stats['consumed_chars'] / max(total_chars, 1):.1f}%) before stopping")
+    print(f"   In memory: {in_memory * 1000:.2f} ms ({in_memory / len(corpus) * 1e6:.0f} µs/README)")
+    print(f"   From disk: {streamed * 1000:.2f} ms ({streamed / len(corpus) * 1e6:.0f} µs/README, best of {repeat})")
+    return stats
@@ -4,31 +4,73 @@ Google Scholar Research Manager
 A comprehensive tool for automatically fetching and displaying research publications from Google Scholar.
 
 Usage:
-    python scholar_manager.py update                # Fetch latest publications from Google Scholar
+    python scholar_manager.py update                # Sync new publications and citation counts from Google Scholar
     python scholar_manager.py generate             # Update research.html with publication cards
+    python scholar_manager.py refresh              # Refetch only if the cache is stale, then regenerate
     python scholar_manager.py list                 # Show all cached publications
     python scholar_manager.py validate             # Check system integrity
     python scholar_manager.py add                  # Manually add a publication
     python scholar_manager.py remove --id ID       # Remove a publication
+    python scholar_manager.py prune --dry-run      # Show which old backups would be deleted
+    python scholar_manager.py update --parser regex # Pick the HTML parser backend (lxml or regex)
+    python scholar_manager.py bench-parser --fixtures DIR  # Compare parser backends on saved pages
+    python scholar_manager.py update --record DIR  # Save raw Scholar responses as fixtures
+    python scholar_manager.py update --replay DIR  # Serve responses from fixtures, no network
+    python scholar_manager.py history              # Show citation growth from the recorded history
 """
 
 import os
 import sys
-import json
 import time
 import re
 import requests
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 import argparse
+import itertools
+import random
+import threading
 import urllib.parse
 import html
+from backup_retention import add_retention_arguments, prune_backups, retention_options
+from state_io import batch_writes, load_json, save_json, write_json_atomic
+from cache_policy import CachePolicy, FRESH, STALE, EXPIRED
+from http_utils import create_session, mount_fixtures, retry_after_seconds, HostRateLimiter, RateLimitPaused
+from scholar_parser import PARSERS, benchmark_parsers, get_parser
+from publication_enrichment import PublicationEnricher
+from citation_history import CitationHistory, sparkline_svg
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+SCHOLAR_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+# Rows per profile page; Scholar accepts up to 100
+SCHOLAR_PAGE_SIZE = 100
+# Safety cap on profile pages (5,000 papers) in case Scholar ignores cstart
+SCHOLAR_MAX_PAGES = 50
+
+# Fields refreshed from the profile table for publications that are already cached
+SYNC_FIELDS = ('citations', 'year')
+
+# Resolved links are checkpointed to the cache every N publications, so a throttled run resumes where it stopped
+LINK_CHECKPOINT_EVERY = 10
+# Google's "unusual traffic" interstitial, served instead of the requested page. Only structural
+# markers and the interstitial's full sentence are matched, never phrases a paper title could contain;
+# the /sorry/ redirect is recognized from the response URL.
+CAPTCHA_PATTERN = re.compile(
+    r'gs_captcha_f|id="captcha-form"|our systems have detected unusual traffic from your computer network',
+    re.IGNORECASE
+)
+
+
+class ScholarThrottled(requests.RequestException):
+    """Scholar answered with a 429 or a CAPTCHA page, or a cool-down from an earlier run is still active."""
 
 class ScholarManager:
     def __init__(self):
         self.config_file = Path("scholar_config.json")
         self.cache_file = Path(".scholar_cache.json")
+        self.throttle_file = Path(".scholar_throttle.json")
+        self.history_file = Path(".scholar_history.db")
         self.research_html = Path("research.html")
         self.backup_dir = Path(".backups")
         self.backup_dir.mkdir(exist_ok=True)
@@ -36,11 +78,31 @@ class ScholarManager:
         # Default Google Scholar settings
         self.user_id = "3cqkF08AAAAJ"  # From provided URL
         self.scholar_base_url = "https://scholar.google.com/citations"
-        self.rate_limit_delay = 2.0  # Seconds between requests
         
         # Load configuration
         self.config = self.load_config()
+        settings = self.config.get('settings', {})
+        self.cache_policy = CachePolicy.from_settings(settings)
         self.cache = self.load_cache()
+        
+        # Detail pages are fetched in parallel through one pooled session, rate limited per host
+        self.max_workers = settings.get('max_workers', 4)
+        self.request_retries = settings.get('request_retries', 3)
+        self.session = create_session(pool_size=self.max_workers, headers={'User-Agent': SCHOLAR_USER_AGENT})
+        self.retry_backoff = settings.get('retry_backoff', 2.0)
+        # Waits up to max_retry_wait are sat out in-process; longer ones become a cool-down for later runs
+        self.max_retry_wait = settings.get('max_retry_wait', 120)
+        self.cooldown_base = settings.get('cooldown_base', 1800)
+        self.cooldown_max = settings.get('cooldown_max', 86400)
+        # The metadata APIs tolerate far more traffic than Scholar, so they get their own faster buckets
+        enrichment_rate = settings.get('enrichment_requests_per_second', 5)
+        self.rate_limiter = HostRateLimiter(rate=settings.get('requests_per_second', 0.5), burst=2,
+                                            host_rates={host: enrichment_rate for host in PublicationEnricher.api_hosts(settings)},
+                                            max_wait=self.max_retry_wait)
+        self.throttled = threading.Event()
+        self.throttle_lock = threading.Lock()
+        self.parser = get_parser(settings.get('parser'))
+        self.enricher = PublicationEnricher(self.session, self.rate_limiter, Path(".scholar_enrichment_cache.json"), settings)
     
     def load_config(self) -> Dict:
         """Load scholar configuration."""
@@ -48,8 +110,7 @@ class ScholarManager:
             return self.create_default_config()
         
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_json(self.config_file)
         except Exception as e:
             print(f"Error loading config: {e}")
             return self.create_default_config()
@@ -66,6 +127,24 @@ class ScholarManager:
             "settings": {
                 "auto_update": True,
                 "cache_duration": 86400,  # 24 hours
+                "cache_max_age": 2592000,  # 30 days
+                "max_workers": 4,
+                "requests_per_second": 0.5,
+                "request_retries": 3,
+                "retry_backoff": 2.0,
+                "max_retry_wait": 120,
+                "cooldown_base": 1800,
+                "cooldown_max": 86400,
+                "parser": "lxml",
+                "enrichment": True,
+                "openalex_url": "https://api.openalex.org",
+                "crossref_url": "https://api.crossref.org",
+                "mailto": None,
+                "enrichment_batch_size": 25,
+                "enrichment_requests_per_second": 5,
+                "enrichment_miss_ttl": 604800,  # 7 days
+                "citation_history": True,
+                "history_delta_days": 365,
                 "max_publications": 50,
                 "sort_by": "year",  # year, citations, title
                 "include_citations": True,
@@ -92,8 +171,7 @@ class ScholarManager:
             config = self.config
         
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            save_json(self.config_file, config)
         except Exception as e:
             print(f"Error saving configuration: {e}")
     
@@ -103,18 +181,8 @@ class ScholarManager:
             return {"publications": [], "last_updated": None, "profile_data": {}}
         
         try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                cache = json.load(f)
-                
-            # Check cache expiration
-            cache_duration = self.config.get('settings', {}).get('cache_duration', 86400)
-            if cache.get('last_updated'):
-                last_updated = datetime.fromisoformat(cache['last_updated'])
-                if (datetime.now() - last_updated).total_seconds() > cache_duration:
-                    print("📅 Cache expired, will fetch fresh data")
-                    return {"publications": [], "last_updated": None, "profile_data": {}}
-            
-            return cache
+            # Expired publications are kept and served until a refresh succeeds
+            return load_json(self.cache_file)
         except Exception as e:
             print(f"Error loading cache: {e}")
             return {"publications": [], "last_updated": None, "profile_data": {}}
@@ -122,11 +190,36 @@ class ScholarManager:
     def save_cache(self):
         """Save cache to file."""
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, indent=2, ensure_ascii=False)
+            save_json(self.cache_file, self.cache, compact=True)
         except Exception as e:
             print(f"Error saving cache: {e}")
     
+    def cache_state(self) -> Optional[str]:
+        """Freshness of the publication cache: FRESH, STALE, EXPIRED or None if never fetched."""
+        return self.cache_policy.state(self.cache, timestamp_key='last_updated')
+    
+    def ensure_publications(self):
+        """Serve cached publications for page generation, fetching only once they have expired."""
+        state = self.cache_state()
+        if state == STALE:
+            print("📅 Publication cache is stale, using it anyway (run 'refresh' to update)")
+        elif state == EXPIRED:
+            print("📅 Publication cache expired, fetching fresh data...")
+            if not self.fetch_scholar_data():
+                print("⚠️  Using expired cached publications")
+    
+    def refresh(self, force: bool = False):
+        """Refetch publications if the cache is stale, then regenerate research.html."""
+        state = self.cache_state()
+        if state == FRESH and not force:
+            print(f"✅ Publication cache is fresh (updated {self.cache.get('last_updated')})")
+            return
+        if self.fetch_scholar_data():
+            print("🔄 Automatically updating research.html...")
+            self.update_research_html()
+        elif state:
+            print("⚠️  Refresh failed, keeping cached publications")
+    
     def create_backup(self) -> Optional[Path]:
         """Create backup of current research.html."""
         if not self.research_html.exists():
@@ -144,28 +237,67 @@ class ScholarManager:
             print(f"❌ Failed to create backup: {e}")
             return None
     
+    def load_throttle_state(self) -> Dict:
+        """Cool-down left by a throttled run: {"cooldown_until": epoch seconds, "strikes": n, "reason": ...}."""
+        if not self.throttle_file.exists():
+            return {}
+        try:
+            return load_json(self.throttle_file)
+        except Exception:
+            return {}
+    
+    def cooldown_remaining(self) -> float:
+        """Seconds until Scholar may be contacted again."""
+        return max(self.load_throttle_state().get('cooldown_until', 0) - time.time(), 0.0)
+    
+    def start_cooldown(self, reason: str, retry_after: Optional[float] = None):
+        """Stop all fetching and persist a cool-down, doubling (with jitter) on consecutive throttled runs."""
+        with self.throttle_lock:
+            if self.throttled.is_set():
+                return
+            self.throttled.set()
+            strikes = self.load_throttle_state().get('strikes', 0) + 1
+            if retry_after is None:
+                delay = min(self.cooldown_max, self.cooldown_base * 2 ** (strikes - 1))
+                retry_after = delay * random.uniform(1.0, 1.25)
+            cooldown_until = time.time() + retry_after
+            write_json_atomic(self.throttle_file, {
+                "cooldown_until": cooldown_until,
+                "strikes": strikes,
+                "reason": reason,
+            })
+            print(f"🛑 Scholar is throttling us ({reason}); cooling down until "
+                  f"{datetime.fromtimestamp(cooldown_until).strftime('%Y-%m-%d %H:%M')}")
+    
+    def clear_cooldown(self):
+        """Forget the strike count after a run that was not throttled."""
+        if self.throttle_file.exists() and not self.throttled.is_set():
+            self.throttle_file.unlink()
+    
+    @batch_writes(checkpoint_every=LINK_CHECKPOINT_EVERY)
     def fetch_scholar_data(self) -> bool:
-        """Fetch publications from Google Scholar profile."""
+        """Sync publications from the Google Scholar profile into the cache."""
+        remaining = self.cooldown_remaining()
+        if remaining:
+            print(f"⏸️  Scholar cool-down active for another {remaining / 60:.0f} min, keeping cached publications")
+            return False
+        
         print("🔍 Fetching publications from Google Scholar...")
         
         profile_url = self.config['profile']['profile_url']
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
         
         try:
-            response = requests.get(profile_url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            html_content = response.text
-            
-            # Extract profile information
-            profile_data = self.extract_profile_data(html_content)
+            # The first page also carries the profile information
+            pages = self.iter_profile_pages(profile_url)
+            first_page = next(pages)
+            profile_data = first_page['profile']
+            if not first_page['has_table']:
+                print("❌ Could not find publications table")
             
-            # Extract publications
-            publications = self.extract_publications(html_content)
+            # Stream publications page by page into the cache merge, then resolve links for new ones
+            publications = self.merge_publications(self.iter_publications(itertools.chain([first_page], pages)))
             
-            # Update cache
+            # Update cache before resolving links, so checkpoints keep the links resolved so far
             self.cache = {
                 "publications": publications,
                 "profile_data": profile_data,
@@ -174,6 +306,10 @@ class ScholarManager:
             }
             
             self.save_cache()
+            self.record_history(profile_data, publications)
+            self.resolve_publication_links(publications)
+            self.save_cache()
+            self.clear_cooldown()
             
             # Update config metadata
             self.config['metadata']['total_publications'] = len(publications)
@@ -183,6 +319,9 @@ class ScholarManager:
             print(f"✅ Successfully fetched {len(publications)} publications")
             return True
             
+        except ScholarThrottled as e:
+            print(f"❌ Scholar fetch stopped: {e}")
+            return False
         except requests.RequestException as e:
             print(f"❌ Network error fetching Scholar data: {e}")
             return False
@@ -190,215 +329,311 @@ class ScholarManager:
             print(f"❌ Error parsing Scholar data: {e}")
             return False
     
-    def extract_profile_data(self, html_content: str) -> Dict:
-        """Extract profile information from Scholar page HTML."""
-        profile_data = {}
+    def use_fixtures(self, record_dir: Optional[Path] = None, replay_dir: Optional[Path] = None):
+        """Record Scholar responses to a directory, or replay them from it without the network."""
+        mount_fixtures(self.session, record_dir=record_dir, replay_dir=replay_dir)
+        if replay_dir:
+            print(f"📼 Replaying Scholar responses from {replay_dir}")
+            self.rate_limiter = HostRateLimiter(rate=None)
+            self.enricher.rate_limiter = self.rate_limiter
+        elif record_dir:
+            print(f"📼 Recording Scholar responses to {record_dir}")
+    
+    def http_get(self, url: str) -> requests.Response:
+        """GET through the pooled session, rate limited per host and retried with backoff.
         
-        try:
-            # Name
-            name_match = re.search(r'<div[^>]*id=["\']gsc_prf_in["\'][^>]*>([^<]+)', html_content)
-            if name_match:
-                profile_data['name'] = html.unescape(name_match.group(1).strip())
-            
-            # Affiliation
-            affiliation_match = re.search(r'<div[^>]*class=["\'][^"\']*gsc_prf_il[^"\']*["\'][^>]*>([^<]+)', html_content)
-            if affiliation_match:
-                profile_data['affiliation'] = html.unescape(affiliation_match.group(1).strip())
-            
-            # Research interests - extract text from links within gsc_prf_int div
-            interests_section = re.search(r'<div[^>]*id=["\']gsc_prf_int["\'][^>]*>(.*?)</div>', html_content, re.DOTALL)
-            if interests_section:
-                interests = re.findall(r'<a[^>]*>([^<]+)</a>', interests_section.group(1))
-                profile_data['interests'] = [html.unescape(interest.strip()) for interest in interests]
-            
-            # Citation metrics - basic extraction
-            metrics = {}
-            citations_match = re.search(r'Citations</td><td[^>]*>(\d+)</td><td[^>]*>(\d+)</td>', html_content)
-            if citations_match:
-                metrics['Citations'] = {
-                    'all_time': citations_match.group(1),
-                    'since_2019': citations_match.group(2)
-                }
-            
-            h_index_match = re.search(r'h-index</td><td[^>]*>(\d+)</td><td[^>]*>(\d+)</td>', html_content)
-            if h_index_match:
-                metrics['h-index'] = {
-                    'all_time': h_index_match.group(1),
-                    'since_2019': h_index_match.group(2)
-                }
-                
-            if metrics:
-                profile_data['metrics'] = metrics
-                
-        except Exception as e:
-            print(f"⚠️  Error extracting profile data: {e}")
+        Raises ScholarThrottled, and starts a cool-down, on a 429 that outlasts the retries or a CAPTCHA page.
+        """
+        if self.throttled.is_set():
+            raise ScholarThrottled("cooling down")
         
-        return profile_data
+        try:
+            response = self.rate_limiter.request(self.session, "GET", url, retries=self.request_retries,
+                                                 backoff=self.retry_backoff, timeout=10)
+        except RateLimitPaused as e:
+            self.start_cooldown("HTTP 429", e.seconds)
+            raise ScholarThrottled(str(e))
+        if response.status_code == 429:
+            self.start_cooldown("HTTP 429", retry_after_seconds(response.headers))
+            raise ScholarThrottled(f"429 Too Many Requests for url: {url}")
+        if '/sorry/' in response.url or CAPTCHA_PATTERN.search(response.text):
+            self.start_cooldown("CAPTCHA")
+            raise ScholarThrottled(f"CAPTCHA served for url: {url}")
+        return response
+    
+    def extract_profile_data(self, html_content: str) -> Dict:
+        """Extract profile information from Scholar page HTML."""
+        return self.parser.parse_profile_page(html_content)['profile']
+    
+    def profile_page_url(self, profile_url: str, cstart: int) -> str:
+        """URL of the profile page starting at row cstart."""
+        parts = urllib.parse.urlparse(profile_url)
+        query = dict(urllib.parse.parse_qsl(parts.query))
+        query.update({'cstart': str(cstart), 'pagesize': str(SCHOLAR_PAGE_SIZE)})
+        return urllib.parse.urlunparse(parts._replace(query=urllib.parse.urlencode(query)))
+    
+    def iter_profile_pages(self, profile_url: str) -> Iterator[Dict]:
+        """Yield each profile page, parsed once, stopping after the first short page.
+        
+        Paging also stops when a page adds no publication not already seen
+        (Scholar ignoring cstart and repeating itself) or after SCHOLAR_MAX_PAGES.
+        """
+        seen = set()
+        for page_number in range(SCHOLAR_MAX_PAGES):
+            cstart = page_number * SCHOLAR_PAGE_SIZE
+            response = self.http_get(self.profile_page_url(profile_url, cstart))
+            response.raise_for_status()
+            page = self.parser.parse_profile_page(response.text)
+            
+            keys = {
+                self.publication_key({
+                    'scholar_url': urllib.parse.urljoin(profile_url, row['href']) if row.get('href') else None,
+                    'title': row.get('title')
+                })
+                for row in page['rows']
+            }
+            keys.discard(None)
+            if seen and not keys - seen:
+                print(f"⚠️  Profile page at cstart={cstart} repeats earlier rows, stopping")
+                return
+            seen |= keys
+            yield page
+            
+            if len(page['rows']) < SCHOLAR_PAGE_SIZE:
+                return
+        print(f"⚠️  Stopped after {SCHOLAR_MAX_PAGES} profile pages")
+    
+    def iter_publications(self, pages: Iterable[Dict]) -> Iterator[Dict]:
+        """Turn parsed rows into publications page by page as the pages arrive."""
+        index = 0
+        for page in pages:
+            for row in page['rows']:
+                index += 1
+                try:
+                    pub_data = self.extract_publication_data(row, index)
+                    if pub_data:
+                        print(f"  📄 {index}. {pub_data['title'][:50]}...")
+                        yield pub_data
+                except Exception as e:
+                    print(f"⚠️  Error extracting publication {index}: {e}")
     
     def extract_publications(self, html_content: str) -> List[Dict]:
         """Extract publication list from Scholar page HTML."""
-        publications = []
+        page = self.parser.parse_profile_page(html_content)
+        if not page['has_table']:
+            print("❌ Could not find publications table")
+        return list(self.iter_publications([page]))
+    
+    def extract_publication_data(self, row: Dict, index: int) -> Optional[Dict]:
+        """Build a publication entry from a parsed profile row."""
+        pub_data = {"id": index}
+        
+        if row.get('href'):
+            pub_data['scholar_url'] = urllib.parse.urljoin(self.config['profile']['profile_url'], row['href'])
+        pub_data['title'] = row.get('title') or f"Publication {index}"
+        
+        # Authors and venue from the gs_gray line
+        details_text = row.get('details')
+        if details_text:
+            pub_data['authors_venue'] = details_text
+            
+            # Try to separate authors and venue
+            if ' - ' in details_text:
+                parts = details_text.split(' - ', 1)
+                pub_data['authors'] = parts[0].strip()
+                pub_data['venue'] = parts[1].strip()
+            else:
+                pub_data['authors'] = details_text
+                pub_data['venue'] = ''
+        else:
+            pub_data['authors'] = 'Unknown Authors'
+            pub_data['venue'] = ''
+        
+        pub_data['citations'] = row.get('citations') or 0
+        pub_data['year'] = row.get('year')
+        
+        # DOI and external links are resolved afterwards by resolve_publication_links
+        pub_data['doi'] = None
+        pub_data['external_url'] = None
+        
+        # Additional metadata
+        pub_data['added_date'] = datetime.now().isoformat()
+        pub_data['featured'] = index <= 3  # Feature top 3 publications
+        
+        return pub_data
+    
+    @staticmethod
+    def publication_key(pub: Dict) -> Optional[str]:
+        """Stable identity of a publication: its Scholar citation id, else its URL, else its title."""
+        url = pub.get('scholar_url')
+        if url:
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(html.unescape(url)).query)
+            citation_ids = query.get('citation_for_view')
+            return citation_ids[0] if citation_ids else url
+        if pub.get('title'):
+            return f"title:{pub['title'].strip().lower()}"
+        return None
+    
+    def merge_publications(self, fetched: Iterable[Dict]) -> List[Dict]:
+        """Merge freshly parsed profile rows into the cached publications.
+        
+        Known publications keep their DOI, links, added date and other local edits;
+        only their citation count and year are taken from the profile. Manual entries
+        are kept, and publications no longer on the profile are dropped.
+        """
+        existing = {}
+        for pub in self.cache.get('publications', []):
+            key = self.publication_key(pub)
+            if key and key not in existing:
+                existing[key] = pub
+        
+        merged = []
+        seen = set()
+        new_count = updated_count = 0
+        for pub in fetched:
+            key = self.publication_key(pub)
+            if key in seen:
+                continue
+            seen.add(key)
+            cached_pub = existing.get(key)
+            if cached_pub is None:
+                merged.append(pub)
+                new_count += 1
+                continue
+            if any(cached_pub.get(field) != pub.get(field) for field in SYNC_FIELDS):
+                updated_count += 1
+            cached_pub.update({field: pub.get(field) for field in SYNC_FIELDS})
+            cached_pub['id'] = pub['id']
+            merged.append(cached_pub)
+        
+        manual = [pub for key, pub in existing.items() if key not in seen and pub.get('manual_entry')]
+        removed_count = len(existing) - (len(merged) - new_count) - len(manual)
+        for offset, pub in enumerate(manual, len(merged) + 1):
+            pub['id'] = offset
+        
+        print(f"  🔄 {new_count} new, {updated_count} updated, {removed_count} removed")
+        return merged + manual
+    
+    def history_key(self, pub: Dict) -> Optional[str]:
+        """Series name of a publication's citation count in the history store."""
+        key = self.publication_key(pub)
+        return f"pub:{key}" if key else None
+    
+    def record_history(self, profile_data: Dict, publications: List[Dict]):
+        """Append this sync's profile metrics and citation counts to the history store."""
+        if not self.config.get('settings', {}).get('citation_history', True):
+            return
+        
+        values = {}
+        for metric, columns in profile_data.get('metrics', {}).items():
+            for column, value in columns.items():
+                if str(value).isdigit():
+                    values[f"profile:{metric}:{column}"] = int(value)
+        for pub in publications:
+            key = self.history_key(pub)
+            if key and isinstance(pub.get('citations'), int):
+                values[key] = pub['citations']
         
         try:
-            # Find publications table section
-            table_match = re.search(r'<table[^>]*id=["\']gsc_a_t["\'][^>]*>(.*?)</table>', html_content, re.DOTALL)
-            if not table_match:
-                print("❌ Could not find publications table")
-                return publications
-            
-            table_content = table_match.group(1)
-            
-            # Find all publication rows
-            rows = re.findall(r'<tr[^>]*class=["\'][^"\']*gsc_a_tr[^"\']*["\'][^>]*>(.*?)</tr>', table_content, re.DOTALL)
-            
-            for i, row_html in enumerate(rows, 1):
-                try:
-                    pub_data = self.extract_publication_data(row_html, i)
-                    if pub_data:
-                        publications.append(pub_data)
-                        print(f"  📄 {i}. {pub_data['title'][:50]}...")
-                        
-                        # Rate limiting
-                        time.sleep(self.rate_limit_delay)
-                        
-                except Exception as e:
-                    print(f"⚠️  Error extracting publication {i}: {e}")
-                    continue
-                    
+            with CitationHistory(self.history_file) as history:
+                changed = history.record(values)
+            print(f"  📈 Recorded citation history ({changed} of {len(values)} values changed)")
         except Exception as e:
-            print(f"❌ Error extracting publications: {e}")
-        
-        return publications
+            print(f"  ⚠️  Could not record citation history: {e}")
     
-    def extract_publication_data(self, row_html: str, index: int) -> Optional[Dict]:
-        """Extract data for a single publication from HTML row."""
+    def load_history(self, publications: List[Dict]) -> Tuple[Dict, Dict]:
+        """Deltas and sparkline points for the given publications, read in one pass over their series."""
+        if not self.history_file.exists():
+            return {}, {}
+        days = self.config.get('settings', {}).get('history_delta_days', 365)
+        keys = [key for key in map(self.history_key, publications) if key]
         try:
-            pub_data = {"id": index}
-            
-            # Title and link
-            title_match = re.search(r'<a[^>]*class=["\'][^"\']*gsc_a_at[^"\']*["\'][^>]*href=["\']([^"\']+)["\'][^>]*>([^<]+)</a>', row_html)
-            if title_match:
-                pub_data['scholar_url'] = 'https://scholar.google.com' + title_match.group(1)
-                pub_data['title'] = html.unescape(title_match.group(2).strip())
-            else:
-                # Try simpler pattern if the first doesn't work
-                title_simple = re.search(r'<a[^>]*class=["\'][^"\']*gsc_a_at[^"\']*["\'][^>]*>([^<]+)</a>', row_html)
-                if title_simple:
-                    pub_data['title'] = html.unescape(title_simple.group(1).strip())
-                else:
-                    pub_data['title'] = f"Publication {index}"
-            
-            # Authors and venue from gs_gray div
-            gray_match = re.search(r'<div[^>]*class=["\'][^"\']*gs_gray[^"\']*["\'][^>]*>([^<]+)</div>', row_html)
-            if gray_match:
-                details_text = html.unescape(gray_match.group(1).strip())
-                pub_data['authors_venue'] = details_text
-                
-                # Try to separate authors and venue
-                if ' - ' in details_text:
-                    parts = details_text.split(' - ', 1)
-                    pub_data['authors'] = parts[0].strip()
-                    pub_data['venue'] = parts[1].strip()
-                else:
-                    pub_data['authors'] = details_text
-                    pub_data['venue'] = ''
-            else:
-                pub_data['authors'] = 'Unknown Authors'
-                pub_data['venue'] = ''
-            
-            # Citation count
-            cite_match = re.search(r'<a[^>]*class=["\'][^"\']*gsc_a_ac[^"\']*["\'][^>]*>(\d+)</a>', row_html)
-            if cite_match:
-                try:
-                    pub_data['citations'] = int(cite_match.group(1))
-                except ValueError:
-                    pub_data['citations'] = 0
-            else:
-                pub_data['citations'] = 0
-            
-            # Year
-            year_match = re.search(r'<span[^>]*class=["\'][^"\']*gsc_a_h[^"\']*["\'][^>]*>(\d{4})</span>', row_html)
-            if year_match:
-                try:
-                    pub_data['year'] = int(year_match.group(1))
-                except ValueError:
-                    pub_data['year'] = None
-            else:
-                pub_data['year'] = None
-            
-            # Try to extract DOI or external links
-            pub_data['doi'] = None
-            pub_data['external_url'] = None
-            
-            # If we have scholar_url, try to fetch DOI from the publication page
-            if 'scholar_url' in pub_data:
-                try:
-                    doi_info = self.extract_doi_from_scholar(pub_data['scholar_url'])
-                    if doi_info:
-                        pub_data.update(doi_info)
-                except Exception as e:
-                    print(f"  ⚠️  Could not fetch DOI for publication {index}: {e}")
-            
-            # Additional metadata
-            pub_data['added_date'] = datetime.now().isoformat()
-            pub_data['featured'] = index <= 3  # Feature top 3 publications
-            
-            return pub_data
-            
+            with CitationHistory(self.history_file) as history:
+                return history.deltas(keys, days=days), history.sparklines(keys)
         except Exception as e:
-            print(f"Error processing publication row: {e}")
-            return None
+            print(f"⚠️  Could not read citation history: {e}")
+            return {}, {}
+    
+    def show_history(self, limit: int = 10):
+        """Print profile metric growth and the publications gaining citations fastest."""
+        if not self.history_file.exists():
+            print("📭 No citation history yet - run update command")
+            return
+        
+        days = self.config.get('settings', {}).get('history_delta_days', 365)
+        publications = self.cache.get('publications', [])
+        with CitationHistory(self.history_file) as history:
+            stats = history.stats()
+            profile_keys = [f"profile:{metric}:{column}" for metric in ("Citations", "h-index")
+                            for column in ("all_time", "since_2019")]
+            profile_deltas = history.deltas(profile_keys, days=days)
+            pub_deltas = history.deltas([key for key in map(self.history_key, publications) if key], days=days)
+        
+        first = datetime.fromtimestamp(stats['first']).strftime('%Y-%m-%d') if stats['first'] else 'N/A'
+        print(f"📈 Citation history: {stats['runs']} runs since {first}, "
+              f"{stats['points']} stored values across {stats['series']} series")
+        for key, (value, delta) in profile_deltas.items():
+            print(f"   {key.split(':', 1)[1]}: {value} ({delta:+d} in {days} days)")
+        
+        titles = {self.history_key(pub): pub.get('title', 'Unknown') for pub in publications}
+        movers = sorted(pub_deltas.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        if movers:
+            print(f"\n🚀 Top publications by new citations in {days} days:")
+            for key, (value, delta) in movers:
+                print(f"   {delta:+5d}  {value:>5}  {titles.get(key, key)[:70]}")
+    
+    def resolve_publication_links(self, publications: List[Dict]):
+        """Fill in DOIs and external links for publications not checked yet.
+
+        Titles are first looked up in bulk on OpenAlex/Crossref; only the misses fall back
+        to fetching Scholar detail pages, in parallel.
+        """
+        pending = [
+            pub for pub in publications
+            if pub.get('scholar_url') and not pub.get('doi') and not pub.get('links_checked')
+        ]
+        if not pending:
+            return
+        
+        pending = [pub for pub in self.enricher.enrich(pending) if not pub.get('links_checked')]
+        self.save_cache()
+        if not pending:
+            return
+        
+        print(f"  🔗 Resolving links for {len(pending)} publications ({min(self.max_workers, len(pending))} workers)...")
+        resolved = 0
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+            futures = {executor.submit(self.extract_doi_from_scholar, pub['scholar_url']): pub for pub in pending}
+            for future in as_completed(futures):
+                pub = futures[future]
+                try:
+                    link_info = future.result()
+                except ScholarThrottled:
+                    continue
+                if link_info is not None:
+                    pub.update(link_info)
+                    pub['links_checked'] = True
+                    resolved += 1
+                    self.save_cache()
+        
+        if self.throttled.is_set():
+            print(f"  ⏸️  Resolved {resolved} of {len(pending)}; the rest resume after the cool-down")
     
     def extract_doi_from_scholar(self, scholar_url: str) -> Optional[Dict]:
-        """Extract DOI and external links from a Scholar publication page."""
+        """Extract DOI and external links from a Scholar publication page (None if it could not be fetched)."""
         try:
-            print(f"    🔗 Fetching DOI from Scholar page...")
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(scholar_url, headers=headers, timeout=10)
+            response = self.http_get(scholar_url)
             response.raise_for_status()
             
-            html_content = response.text
-            link_info = {}
-            
-            # Try to find DOI links in various formats
-            doi_patterns = [
-                r'https?://(?:dx\.)?doi\.org/(10\.\S+)',
-                r'doi:?\s*(10\.\S+)',
-                r'DOI:?\s*(10\.\S+)'
-            ]
-            
-            for pattern in doi_patterns:
-                doi_match = re.search(pattern, html_content, re.IGNORECASE)
-                if doi_match:
-                    doi = doi_match.group(1)
-                    link_info['doi'] = doi
-                    link_info['doi_url'] = f'https://doi.org/{doi}'
-                    print(f"    ✅ Found DOI: {doi}")
-                    break
-            
-            # Try to find external publication links
-            external_patterns = [
-                r'<a[^>]*href=["\']([^"\']*(?:arxiv\.org|pubmed|nature\.com|science\.org|aps\.org|iop\.org|springer\.com|wiley\.com|elsevier\.com)[^"\']*)["\'][^>]*>',
-                r'<a[^>]*href=["\']([^"\']*\.pdf)["\'][^>]*>'
-            ]
-            
-            for pattern in external_patterns:
-                external_match = re.search(pattern, html_content, re.IGNORECASE)
-                if external_match and not link_info.get('external_url'):
-                    url = external_match.group(1)
-                    if url.startswith('http'):
-                        link_info['external_url'] = url
-                        print(f"    🔗 Found external link: {url[:50]}...")
-                        break
-            
-            # Rate limiting
-            time.sleep(self.rate_limit_delay * 2)  # Longer delay for detailed pages
-            
-            return link_info if link_info else None
+            link_info = self.parser.parse_detail_page(response.text)
+            if link_info.get('doi'):
+                print(f"    ✅ Found DOI: {link_info['doi']}")
+            if link_info.get('external_url'):
+                print(f"    🔗 Found external link: {link_info['external_url'][:50]}...")
+            return link_info
             
+        except ScholarThrottled:
+            raise
         except Exception as e:
             print(f"    ❌ Error fetching DOI: {e}")
             return None
@@ -528,11 +763,12 @@ class ScholarManager:
             publications = sorted(publications, key=lambda x: x.get('citations', 0), reverse=True)
         
         html_parts = []
+        deltas, sparklines = self.load_history(publications)
         
         for pub in publications:
             title = pub.get('title', 'Unknown Title')
             authors = pub.get('authors', 'Unknown Authors')
-            venue = pub.get('venue', '')
+            venue = pub.get('canonical_venue') or pub.get('venue', '')
             year = pub.get('year', 'N/A')
             citations = pub.get('citations', 0)
             scholar_url = pub.get('scholar_url', '')
@@ -540,6 +776,13 @@ class ScholarManager:
             external_url = pub.get('external_url', '')
             featured = pub.get('featured', False)
             
+            history_key = self.history_key(pub)
+            sparkline = sparkline_svg(sparklines.get(history_key, []))
+            delta = deltas.get(history_key, (0, 0))[1]
+            trend_html = ''
+            if sparkline or delta > 0:
+                trend_html = f'<span class="pub-trend" title="Citations over time">{sparkline}{f" +{delta}" if delta > 0 else ""}</span>'
+            
             # Determine best link for title - prefer DOI, then external, then Scholar
             title_link = doi_url or external_url or scholar_url
             link_icon = "📄" if doi_url else "🔗" if external_url else "📚"
@@ -559,6 +802,7 @@ class ScholarManager:
                     {f'<div class="pub-venue">{venue}</div>' if venue else ''}
                     <div class="pub-metrics">
                         <span class="citations">📚 {citations} citation{'s' if citations != 1 else ''}</span>
+                        {trend_html}
                         <div class="pub-links">
                             {f'<a href="{doi_url}" target="_blank" class="doi-link" title="View DOI">📄 DOI</a>' if doi_url else ''}
                             {f'<a href="{external_url}" target="_blank" class="external-link" title="View Publication">🔗 Full Text</a>' if external_url and not doi_url else ''}
@@ -707,12 +951,26 @@ class ScholarManager:
 def main():
     parser = argparse.ArgumentParser(description="Google Scholar Research Manager")
     parser.add_argument("command", choices=[
-        "update", "generate", "list", "validate", "add", "links"
+        "update", "generate", "list", "validate", "add", "links", "prune", "refresh", "bench-parser", "history"
     ], help="Command to execute")
     parser.add_argument("--id", type=int, help="Publication ID for remove command")
+    parser.add_argument("--parser", choices=sorted(PARSERS), help="HTML parser backend (default: settings.parser, else lxml if installed)")
+    parser.add_argument("--fixtures", type=Path, help="Directory of saved Scholar pages for bench-parser")
+    parser.add_argument("--record", type=Path, metavar="DIR", help="Save raw Scholar responses as fixtures")
+    parser.add_argument("--replay", type=Path, metavar="DIR", help="Serve Scholar responses from fixtures, no network")
+    add_retention_arguments(parser)
     
     args = parser.parse_args()
+    if args.command == "bench-parser":
+        if not args.fixtures:
+            parser.error("bench-parser needs --fixtures DIR")
+        benchmark_parsers(args.fixtures)
+        return
+    
     manager = ScholarManager()
+    manager.use_fixtures(record_dir=args.record, replay_dir=args.replay)
+    if args.parser:
+        manager.parser = get_parser(args.parser)
     
     if args.command == "update":
         success = manager.fetch_scholar_data()
@@ -721,8 +979,12 @@ def main():
             manager.update_research_html()
     
     elif args.command == "generate":
+        manager.ensure_publications()
         manager.update_research_html()
     
+    elif args.command == "refresh":
+        manager.refresh()
+    
     elif args.command == "list":
         manager.list_publications()
     
@@ -742,6 +1004,12 @@ def main():
         manager.update_publication_links()
         print("🔄 Regenerating research.html...")
         manager.update_research_html()
+    
+    elif args.command == "history":
+        manager.show_history()
+    
+    elif args.command == "prune":
+        prune_backups(manager.backup_dir, **retention_options(args))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Scholar Parser
+HTML extraction backends for Google Scholar profile and publication pages.
+
+Both backends return the same plain dicts, so scholar_manager.py can switch
+between them with settings.parser:
+    regex  precompiled regular expressions over the raw HTML (no dependencies)
+    lxml   one lxml tree per page, with every field read by XPath in a single pass
+
+Usage:
+    from scholar_parser import get_parser, benchmark_parsers
+    parser = get_parser("lxml")
+    page = parser.parse_profile_page(html)    # {"profile": {...}, "rows": [{...}, ...]}
+    links = parser.parse_detail_page(html)    # {"doi": ..., "doi_url": ..., "external_url": ...}
+    benchmark_parsers(Path("fixtures"))       # compare backends on saved pages
+"""
+
+import html
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Metrics read from the profile's citation table
+PROFILE_METRICS = ("Citations", "h-index")
+
+# A DOI ends at whitespace, quotes or markup, so one inside an href is not captured with its closing quote
+DOI_PATTERNS = [
+    re.compile(r'https?://(?:dx\.)?doi\.org/(10\.[^\s"\'<>]+)', re.IGNORECASE),
+    re.compile(r'doi:?\s*(10\.[^\s"\'<>]+)', re.IGNORECASE),
+]
+EXTERNAL_HOST_PATTERN = re.compile(
+    r'arxiv\.org|pubmed|nature\.com|science\.org|aps\.org|iop\.org|springer\.com|wiley\.com|elsevier\.com',
+    re.IGNORECASE
+)
+
+
+def _link_info(doi: Optional[str], external_url: Optional[str]) -> Dict:
+    link_info = {}
+    if doi:
+        link_info['doi'] = doi
+        link_info['doi_url'] = f'https://doi.org/{doi}'
+    if external_url:
+        link_info['external_url'] = external_url
+    return link_info
+
+
+def _to_int(text: Optional[str]) -> Optional[int]:
+    text = (text or '').strip()
+    return int(text) if text.isdigit() else None
+
+
+class RegexScholarParser:
+    """Extracts Scholar fields with precompiled regular expressions."""
+
+    name = "regex"
+
+    PROFILE_NAME = re.compile(r'<div[^>]*id=["\']gsc_prf_in["\'][^>]*>([^<]+)')
+    AFFILIATION = re.compile(r'<div[^>]*class=["\'][^"\']*gsc_prf_il[^"\']*["\'][^>]*>([^<]+)')
+    INTERESTS = re.compile(r'<div[^>]*id=["\']gsc_prf_int["\'][^>]*>(.*?)</div>', re.DOTALL)
+    INTEREST_LINK = re.compile(r'<a[^>]*>([^<]+)</a>')
+    METRICS = {
+        label: re.compile(re.escape(label) + r'(?:</a>)?</td><td[^>]*>(\d+)</td><td[^>]*>(\d+)</td>')
+        for label in PROFILE_METRICS
+    }
+    TABLE = re.compile(r'<table[^>]*id=["\']gsc_a_t["\'][^>]*>(.*?)</table>', re.DOTALL)
+    ROW = re.compile(r'<tr[^>]*class=["\'][^"\']*gsc_a_tr[^"\']*["\'][^>]*>(.*?)</tr>', re.DOTALL)
+    # The title link's attributes come in any order, so its href is read from the matched tag
+    TITLE = re.compile(r'<a([^>]*class=["\'][^"\']*gsc_a_at[^"\']*["\'][^>]*)>([^<]+)</a>')
+    HREF = re.compile(r'href=["\']([^"\']+)["\']')
+    DETAILS = re.compile(r'<div[^>]*class=["\'][^"\']*gs_gray[^"\']*["\'][^>]*>([^<]+)</div>')
+    CITATIONS = re.compile(r'<a[^>]*class=["\'][^"\']*gsc_a_ac[^"\']*["\'][^>]*>(\d+)</a>')
+    YEAR = re.compile(r'<span[^>]*class=["\'][^"\']*gsc_a_h[^"\']*["\'][^>]*>(\d{4})</span>')
+    EXTERNAL_LINK = re.compile(r'<a[^>]*href=["\']([^"\']*)["\'][^>]*>')
+
+    def parse_profile(self, page_html: str) -> Dict:
+        profile = {}
+        name_match = self.PROFILE_NAME.search(page_html)
+        if name_match:
+            profile['name'] = html.unescape(name_match.group(1).strip())
+
+        affiliation_match = self.AFFILIATION.search(page_html)
+        if affiliation_match:
+            profile['affiliation'] = html.unescape(affiliation_match.group(1).strip())
+
+        interests_section = self.INTERESTS.search(page_html)
+        if interests_section:
+            interests = self.INTEREST_LINK.findall(interests_section.group(1))
+            profile['interests'] = [html.unescape(interest.strip()) for interest in interests]
+
+        metrics = {}
+        for label, pattern in self.METRICS.items():
+            metric_match = pattern.search(page_html)
+            if metric_match:
+                metrics[label] = {'all_time': metric_match.group(1), 'since_2019': metric_match.group(2)}
+        if metrics:
+            profile['metrics'] = metrics
+        return profile
+
+    def parse_row(self, row_html: str) -> Dict:
+        row = {'href': None, 'title': None, 'details': None}
+        title_match = self.TITLE.search(row_html)
+        if title_match:
+            href_match = self.HREF.search(title_match.group(1))
+            if href_match:
+                row['href'] = html.unescape(href_match.group(1))
+            row['title'] = html.unescape(title_match.group(2).strip())
+
+        details_match = self.DETAILS.search(row_html)
+        if details_match:
+            row['details'] = html.unescape(details_match.group(1).strip())
+
+        cite_match = self.CITATIONS.search(row_html)
+        row['citations'] = int(cite_match.group(1)) if cite_match else 0
+        year_match = self.YEAR.search(row_html)
+        row['year'] = int(year_match.group(1)) if year_match else None
+        return row
+
+    def parse_profile_page(self, page_html: str) -> Dict:
+        """Profile details and publication rows of one profile page."""
+        table_match = self.TABLE.search(page_html)
+        rows = [self.parse_row(row_match.group(1)) for row_match in self.ROW.finditer(table_match.group(1))] if table_match else []
+        return {"profile": self.parse_profile(page_html), "rows": rows, "has_table": bool(table_match)}
+
+    def parse_detail_page(self, page_html: str) -> Dict:
+        """DOI and external link found on a publication's detail page."""
+        doi = None
+        for pattern in DOI_PATTERNS:
+            doi_match = pattern.search(page_html)
+            if doi_match:
+                doi = doi_match.group(1)
+                break
+
+        hrefs = [html.unescape(href) for href in self.EXTERNAL_LINK.findall(page_html)]
+        return _link_info(doi, _external_url(hrefs))
+
+
+def _external_url(hrefs: List[str]) -> Optional[str]:
+    """First publisher/arXiv link, else the first PDF link, among absolute URLs."""
+    for matches in (EXTERNAL_HOST_PATTERN.search, lambda href: href.lower().endswith('.pdf')):
+        href = next((href for href in hrefs if matches(href)), None)
+        if href and href.startswith('http'):
+            return href
+    return None
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class LxmlScholarParser:
+    """Builds one lxml tree per page and reads every field with XPath."""
+
+    name = "lxml"
+
+    def __init__(self):
+        if not LXML_AVAILABLE:
+            raise ImportError("lxml is not installed (pip install lxml)")
+
+    @staticmethod
+    def _text(elements) -> Optional[str]:
+        return elements[0].text_content().strip() if elements else None
+
+    def parse_profile(self, tree) -> Dict:
+        profile = {}
+        name = self._text(tree.xpath('//*[@id="gsc_prf_in"]'))
+        if name:
+            profile['name'] = name
+        affiliation = self._text(tree.xpath(f'//div[{_has_class("gsc_prf_il")}]'))
+        if affiliation:
+            profile['affiliation'] = affiliation
+
+        interests_section = tree.xpath('//div[@id="gsc_prf_int"]')
+        if interests_section:
+            profile['interests'] = [link.text_content().strip() for link in interests_section[0].xpath('.//a')]
+
+        metrics = {}
+        for table_row in tree.xpath('//table[@id="gsc_rsb_st"]//tr'):
+            cells = table_row.xpath('td')
+            if len(cells) >= 3:
+                label = cells[0].text_content().strip()
+                values = [cell.text_content().strip() for cell in cells[1:3]]
+                if label in PROFILE_METRICS and all(value.isdigit() for value in values):
+                    metrics[label] = {'all_time': values[0], 'since_2019': values[1]}
+        if metrics:
+            profile['metrics'] = metrics
+        return profile
+
+    def parse_row(self, element) -> Dict:
+        title_link = element.xpath(f'.//a[{_has_class("gsc_a_at")}]')
+        details = element.xpath(f'.//div[{_has_class("gs_gray")}]')
+        citations = element.xpath(f'.//a[{_has_class("gsc_a_ac")}]')
+        year = element.xpath(f'.//span[{_has_class("gsc_a_h")}]')
+        return {
+            'href': title_link[0].get('href') if title_link else None,
+            'title': self._text(title_link),
+            'details': self._text(details),
+            'citations': _to_int(self._text(citations)) or 0,
+            'year': _to_int(self._text(year)),
+        }
+
+    def parse_profile_page(self, page_html: str) -> Dict:
+        """Profile details and publication rows of one profile page."""
+        tree = lxml.html.fromstring(page_html)
+        tables = tree.xpath('//table[@id="gsc_a_t"]')
+        rows = [self.parse_row(element) for element in tables[0].xpath(f'.//tr[{_has_class("gsc_a_tr")}]')] if tables else []
+        return {"profile": self.parse_profile(tree), "rows": rows, "has_table": bool(tables)}
+
+    def parse_detail_page(self, page_html: str) -> Dict:
+        """DOI and external link found on a publication's detail page."""
+        tree = lxml.html.fromstring(page_html)
+        hrefs = tree.xpath('//a/@href')
+
+        sources = hrefs + [tree.text_content()]
+        doi = None
+        for pattern in DOI_PATTERNS:
+            doi_match = next(filter(None, map(pattern.search, sources)), None)
+            if doi_match:
+                doi = doi_match.group(1)
+                break
+        return _link_info(doi, _external_url(hrefs))
+
+
+PARSERS = {
+    "regex": RegexScholarParser,
+    "lxml": LxmlScholarParser,
+}
+
+
+def default_parser_name() -> str:
+    return "lxml" if LXML_AVAILABLE else "regex"
+
+
+def get_parser(name: Optional[str] = None):
+    """Create the named backend, falling back to regex when lxml is not installed."""
+    name = name or default_parser_name()
+    if name not in PARSERS:
+        raise ValueError(f"Unknown Scholar parser '{name}' (choose from {', '.join(PARSERS)})")
+    if name == "lxml" and not LXML_AVAILABLE:
+        print("⚠️  lxml is not installed, using the regex parser")
+        name = "regex"
+    return PARSERS[name]()
+
+
+def benchmark_parsers(fixtures_dir: Path, repeat: int = 5) -> Dict:
+    """Time every available backend on saved profile and detail pages, and check they agree.
+
+    fixtures_dir may hold plain .html files or responses recorded with --record.
+    """
+    pages = []
+    for path in sorted(Path(fixtures_dir).rglob('*')):
+        if not path.is_file():
+            continue
+        if path.suffix.lower() == '.json':
+            # Responses captured with --record
+            content = json.loads(path.read_text(encoding='utf-8')).get('text')
+            if not content:
+                continue
+        elif path.suffix.lower() in ('.html', '.htm', ''):
+            content = path.read_text(encoding='utf-8', errors='replace')
+        else:
+            continue
+        kind = "profile" if 'gsc_a_t' in content else "detail"
+        pages.append((path, kind, content))
+    if not pages:
+        print(f"❌ No saved HTML pages found in {fixtures_dir}")
+        return {}
+
+    parsers = [PARSERS[name]() for name in PARSERS if name != "lxml" or LXML_AVAILABLE]
+    total_kb = sum(len(content) for _, _, content in pages) / 1024
+    print(f"📊 {len(pages)} pages ({sum(kind == 'profile' for _, kind, _ in pages)} profile), {total_kb:.0f} KB")
+
+    results = {}
+    outputs = {}
+    for parser in parsers:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parsed = [
+                parser.parse_profile_page(content) if kind == "profile" else parser.parse_detail_page(content)
+                for _, kind, content in pages
+            ]
+            best = min(best, time.perf_counter() - start)
+        outputs[parser.name] = parsed
+        results[parser.name] = best
+        print(f"   {parser.name:6} {best * 1000:8.2f} ms ({best / len(pages) * 1000:.2f} ms/page, best of {repeat})")
+
+    if len(outputs) > 1:
+        reference_name, reference = next(iter(outputs.items()))
+        for name, parsed in outputs.items():
+            differing = [path.name for (path, _, _), a, b in zip(pages, reference, parsed) if a != b]
+            if name != reference_name and differing:
+                print(f"⚠️  {name} and {reference_name} disagree on {len(differing)} pages: {', '.join(differing[:5])}")
+    return results
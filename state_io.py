@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+State I/O
+Crash-safe JSON persistence shared by every manager.
+
+Files are written to a temporary file in the same directory, fsync'd and then
+moved over the target with os.replace, so a crash mid-write leaves either the
+old or the new contents, never a truncated file. Caches can be written in a
+compact encoding (orjson when installed), while hand-edited configuration
+files keep the familiar indent=2 layout.
+
+Inside batch_writes(), repeated saves of the same file are coalesced: the
+data is serialized once, when the outermost batch exits. A save's success
+message is only printed once its data is really on disk, and write errors
+at the end of a batch are reported there instead of escaping the caller.
+
+Usage:
+    from state_io import load_json, save_json, batch_writes
+    config = load_json(Path("projects.json"))
+    save_json(Path("projects.json"), config)                      # pretty, for files people edit
+    save_json(Path(".projects_cache.json"), cache, compact=True)  # compact, for caches
+    save_json(path, data, message="✅ Saved")                     # message printed after the write
+
+    with batch_writes():         # or @batch_writes() on a method
+        for item in items:
+            save_json(path, cache, compact=True)   # written once, on exit
+
+    with batch_writes(checkpoint_every=25):        # ...plus a checkpoint every 25 saves
+        ...
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Path -> (data, compact, message) for saves deferred by batch_writes()
+_pending: Dict[Path, Tuple[Any, bool, Optional[str]]] = {}
+_batch_depth = 0
+# Checkpoint interval of each open batch (None = flush only at the end)
+_checkpoints: List[Optional[int]] = []
+_saves_since_flush = 0
+
+
+def encode_json(data: Any, compact: bool = False) -> bytes:
+    """Serialize data the way the managers store it on disk."""
+    if compact:
+        if ORJSON_AVAILABLE:
+            try:
+                return orjson.dumps(data)
+            except TypeError:
+                pass  # e.g. non-string keys, which the stdlib encoder handles
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def load_json(path: Path) -> Any:
+    """Read a JSON file written in either the pretty or the compact encoding."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
+def fsync_dir(directory: Path):
+    """Flush directory entries (renames, new files) to disk where the OS allows it."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_json_atomic(path: Path, data: Any, compact: bool = False):
+    """Write JSON immediately via temp file + fsync + os.replace, bypassing any batch."""
+    path = Path(path)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(encode_json(data, compact))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    fsync_dir(path.parent if str(path.parent) else Path("."))
+
+
+def save_json(path: Path, data: Any, compact: bool = False, message: Optional[str] = None) -> bool:
+    """Save JSON atomically, or defer it to the end of the current batch.
+
+    Returns True if the file was written now and False if the save was
+    deferred. message, if given, is printed once the data is on disk.
+    """
+    global _saves_since_flush
+    if not _batch_depth:
+        write_json_atomic(path, data, compact)
+        if message:
+            print(message)
+        return True
+    
+    _pending[Path(path)] = (data, compact, message)
+    _saves_since_flush += 1
+    intervals = [every for every in _checkpoints if every]
+    if intervals and _saves_since_flush >= min(intervals):
+        flush_writes()
+    return False
+
+
+def is_pending(path: Path) -> bool:
+    """True if a save of this file is waiting for the current batch to finish."""
+    return Path(path) in _pending
+
+
+def flush_writes():
+    """Write every deferred save now.
+
+    Every pending file is attempted even if one fails; the first error is
+    re-raised afterwards so callers see that something was not saved.
+    """
+    global _saves_since_flush
+    _saves_since_flush = 0
+    first_error = None
+    while _pending:
+        path, (data, compact, message) = _pending.popitem()
+        try:
+            write_json_atomic(path, data, compact)
+        except Exception as e:
+            print(f"❌ Error saving {path}: {e}")
+            first_error = first_error or e
+            continue
+        if message:
+            print(message)
+    if first_error is not None:
+        raise first_error
+
+
+@contextmanager
+def batch_writes(checkpoint_every: Optional[int] = None):
+    """Coalesce saves made inside the block into one write per file.
+
+    With checkpoint_every, pending saves are also flushed after that many
+    save calls, so a crash part-way through a long loop loses at most one
+    checkpoint's worth of work. Deferred saves are flushed even if the
+    block raises, matching what the un-batched code would already have
+    written by then. Errors from that final flush are printed rather than
+    raised, as the managers' own save methods do, since there is no caller
+    left to handle them.
+    """
+    global _batch_depth
+    _batch_depth += 1
+    _checkpoints.append(checkpoint_every)
+    try:
+        yield
+    finally:
+        _checkpoints.pop()
+        _batch_depth -= 1
+        if not _batch_depth:
+            try:
+                flush_writes()
+            except Exception:
+                pass  # already reported by flush_writes